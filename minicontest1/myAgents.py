@@ -12,11 +12,14 @@
 # Pieter Abbeel (pabbeel@cs.berkeley.edu).
 
 from game import Agent
+from game import Directions
 from searchProblems import PositionSearchProblem
+from searchProblems import unitCost
 
 import util
 import time
 import search
+import distanceOracle
 
 """
 IMPORTANT
@@ -67,14 +70,22 @@ class ClosestDotAgent(Agent):
         startPosition = gameState.getPacmanPosition(self.index)
         food = gameState.getFood()
         walls = gameState.getWalls()
-        problem = AnyFoodSearchProblem(gameState, self.index)
 
 
         "*** YOUR CODE HERE ***"
-        return search.aStarSearch(AnyFoodSearchProblem(gameState, self.index))
+        # The nearest-food field is kept across moves and repaired as any
+        # pacman eats, rather than searched again from scratch every turn.
+        if getattr(self, 'foodField', None) is None or self.foodField.walls != walls:
+            self.foodField = distanceOracle.NearestFoodField(walls, food)
+        else:
+            self.foodField.syncFood(food)
+        return self.foodField.getPathToNearest(startPosition) or []
 
     def getAction(self, state):
-        return self.findPathToClosestDot(state)[0]
+        path = self.findPathToClosestDot(state)
+        if not path:
+            return Directions.STOP
+        return path[0]
 
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
@@ -99,7 +110,7 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         # Store info for the PositionSearchProblem (no need to change this)
         self.walls = gameState.getWalls()
         self.startState = gameState.getPacmanPosition(agentIndex)
-        self.costFn = lambda x: 1
+        self.costFn = unitCost
         self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
 
     def isGoalState(self, state):
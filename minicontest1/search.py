@@ -73,11 +73,29 @@ def tinyMazeSearch(problem):
     return  [s, s, w, s, w, w, s, w]
 
 class Node:
-    def __init__(self, state, path = [], cost = 0):
+    """
+    A search node.  Rather than copying the full action list into every child,
+    each node only remembers its parent and the action that led to it; the
+    plan is rebuilt once, by getPath, when a goal node is popped.
+    """
+    __slots__ = ('state', 'parent', 'action', 'cost')
+
+    def __init__(self, state, parent = None, action = None, cost = 0):
         self.state = state
-        self.path = path
+        self.parent = parent
+        self.action = action
         self.cost = cost
 
+    def getPath(self):
+        "Returns the list of actions leading from the root to this node."
+        path = []
+        node = self
+        while node.parent is not None:
+            path.append(node.action)
+            node = node.parent
+        path.reverse()
+        return path
+
 
 def depthFirstSearch(problem):
     """
@@ -103,14 +121,14 @@ def depthFirstSearch(problem):
         currentNode = stack.pop()
 
         if problem.isGoalState(currentNode.state):
-            return currentNode.path
+            return currentNode.getPath()
 
         if currentNode.state in visitedNodes:
             continue
         
         visitedNodes.add(currentNode.state)
         for child in problem.getSuccessors(currentNode.state):
-            node = Node(child[0], currentNode.path + [child[1]])
+            node = Node(child[0], currentNode, child[1])
             stack.push(node)
     return []
 
@@ -126,14 +144,14 @@ def breadthFirstSearch(problem):
         currentNode = queue.pop()
 
         if problem.isGoalState(currentNode.state):
-            return currentNode.path
+            return currentNode.getPath()
 
         if currentNode.state in visitedNodes:
             continue
         
         visitedNodes.add(currentNode.state)
         for child in problem.getSuccessors(currentNode.state):
-            node = Node(child[0], currentNode.path + [child[1]])
+            node = Node(child[0], currentNode, child[1])
             queue.push(node)
     return []
 
@@ -149,14 +167,14 @@ def uniformCostSearch(problem):
         currentNode = pQueue.pop()
 
         if problem.isGoalState(currentNode.state):
-            return currentNode.path
+            return currentNode.getPath()
 
         if currentNode.state in visitedNodes:
             continue
         
         visitedNodes.add(currentNode.state)
         for child in problem.getSuccessors(currentNode.state):
-            node = Node(child[0], currentNode.path + [child[1]], currentNode.cost + child[2])
+            node = Node(child[0], currentNode, child[1], currentNode.cost + child[2])
             pQueue.update(node, node.cost)
     return []
 
@@ -179,20 +197,146 @@ def aStarSearch(problem, heuristic=nullHeuristic):
         currentNode = pQueue.pop()
 
         if problem.isGoalState(currentNode.state):
-            return currentNode.path
+            return currentNode.getPath()
 
         if currentNode.state in visitedNodes:
             continue
         
         visitedNodes.add(currentNode.state)
         for child in problem.getSuccessors(currentNode.state):
-            node = Node(child[0], currentNode.path + [child[1]], currentNode.cost + child[2])
+            node = Node(child[0], currentNode, child[1], currentNode.cost + child[2])
             pQueue.update(node, node.cost + heuristic(child[0], problem))
     return []
 
 
+def _recordExpansion(problem, state):
+    "Keeps the display bookkeeping of the grid problems for searches that skip getSuccessors."
+    if '_expanded' in dir(problem):
+        problem._expanded += 1
+        if state not in problem._visited:
+            problem._visited[state] = True
+            problem._visitedlist.append(state)
+
+def _checkGridProblem(problem, searchName):
+    """
+    Raises TypeError unless problem's states are (x, y) positions in
+    problem.walls and problem.hasUnitCosts() says every step costs 1.
+    """
+    walls = getattr(problem, 'walls', None)
+    start = problem.getStartState()
+    isPosition = isinstance(start, tuple) and len(start) == 2 and \
+        all(isinstance(coordinate, int) for coordinate in start)
+    if walls is None or not hasattr(walls, 'width') or not isPosition:
+        raise TypeError('%s needs a problem whose states are (x, y) positions and that has '
+                        'a walls Grid, such as PositionSearchProblem or AnyFoodSearchProblem; '
+                        'got %s' % (searchName, type(problem).__name__))
+    hasUnitCosts = getattr(problem, 'hasUnitCosts', None)
+    if hasUnitCosts is None or not hasUnitCosts():
+        raise TypeError('%s needs every step to cost 1, but this %s has another costFn'
+                        % (searchName, type(problem).__name__))
+
+def jumpPointSearch(problem, heuristic=nullHeuristic):
+    """
+    Jump Point Search for uniform-cost problems on Pacman's 4-connected grid,
+    such as PositionSearchProblem and AnyFoodSearchProblem.  States must be
+    (x, y) positions, every step must cost 1 and problem.walls must be the
+    layout's walls Grid.
+
+    Among equally short paths only those that make their vertical moves
+    before their horizontal ones are searched.  A horizontal scan runs until
+    it reaches a goal or a cell whose vertical neighbour opens up where the
+    previous cell's was blocked; a vertical scan also stops at any cell from
+    which a horizontal scan finds such a cell.  Only the cells where scans
+    stop are expanded, so a corridor costs one expansion however long it is.
+    The jumps are unrolled into single steps, so the plan is a standard list
+    of actions with the same cost A* would find.
+    """
+    from game import Directions
+    _checkGridProblem(problem, 'jumpPointSearch')
+    walls = problem.walls
+    width, height = walls.width, walls.height
+    directions = {(0, 1): Directions.NORTH, (0, -1): Directions.SOUTH,
+                  (1, 0): Directions.EAST, (-1, 0): Directions.WEST}
+
+    def isOpen(x, y):
+        return 0 <= x < width and 0 <= y < height and not walls[x][y]
+
+    def jumpHorizontally(x, y, dx):
+        while True:
+            x += dx
+            if not isOpen(x, y):
+                return None
+            if problem.isGoalState((x, y)):
+                return (x, y)
+            if (isOpen(x, y + 1) and not isOpen(x - dx, y + 1)) or \
+               (isOpen(x, y - 1) and not isOpen(x - dx, y - 1)):
+                return (x, y)
+
+    def jumpVertically(x, y, dy):
+        while True:
+            y += dy
+            if not isOpen(x, y):
+                return None
+            if problem.isGoalState((x, y)) or jumpHorizontally(x, y, 1) is not None \
+               or jumpHorizontally(x, y, -1) is not None:
+                return (x, y)
+
+    def jumpDirections(position, heading):
+        "The directions worth scanning from a jump point reached moving along heading."
+        if heading is None:
+            return list(directions)
+        dx, dy = heading
+        if dy != 0:
+            return [heading, (1, 0), (-1, 0)]
+        x, y = position
+        return [heading] + [(0, side) for side in (1, -1)
+                            if isOpen(x, y + side) and not isOpen(x - dx, y + side)]
+
+    # Search nodes are (position, heading) since the directions scanned
+    # from a jump point depend on how it was reached.
+    start = (problem.getStartState(), None)
+    parents, costs = {start: None}, {start: 0}
+    closed = set()
+    queue = util.PriorityQueue()
+    queue.push(start, heuristic(start[0], problem))
+
+    while not queue.isEmpty():
+        node = queue.pop()
+        if node in closed:
+            continue
+        position, heading = node
+        if problem.isGoalState(position):
+            path = []
+            while parents[node] is not None:
+                parent = parents[node]
+                steps = abs(node[0][0] - parent[0][0]) + abs(node[0][1] - parent[0][1])
+                path.extend([directions[node[1]]] * steps)
+                node = parent
+            path.reverse()
+            return path
+        closed.add(node)
+        _recordExpansion(problem, position)
+
+        x, y = position
+        for dx, dy in jumpDirections(position, heading):
+            if dy == 0:
+                jumpPoint = jumpHorizontally(x, y, dx)
+            else:
+                jumpPoint = jumpVertically(x, y, dy)
+            if jumpPoint is None:
+                continue
+            child = (jumpPoint, (dx, dy))
+            cost = costs[node] + abs(jumpPoint[0] - x) + abs(jumpPoint[1] - y)
+            if child not in costs or cost < costs[child]:
+                costs[child] = cost
+                parents[child] = node
+                queue.update(child, cost + heuristic(jumpPoint, problem))
+    return []
+
+
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+jps = jumpPointSearch
@@ -43,6 +43,10 @@ import util
 import time
 import random
 
+def unitCost(position):
+    "The default costFn of PositionSearchProblem: every step costs 1."
+    return 1
+
 class PositionSearchProblem(search.SearchProblem):
     """
     A search problem defines the state space, start state, goal test, successor
@@ -54,7 +58,7 @@ class PositionSearchProblem(search.SearchProblem):
     Note: this search problem is fully specified; you should NOT change it.
     """
 
-    def __init__(self, gameState, agentIndex=None, costFn = lambda x: 1, goal=(1,1),
+    def __init__(self, gameState, agentIndex=None, costFn = unitCost, goal=(1,1),
                  start=None, warn=True, visualize=True):
         """
         Stores the start and goal.
@@ -81,6 +85,10 @@ class PositionSearchProblem(search.SearchProblem):
     def getStartState(self):
         return self.startState
 
+    def hasUnitCosts(self):
+        "True when every step costs 1, as jumpPointSearch needs."
+        return self.costFn is unitCost
+
     def isGoalState(self, state):
         isGoal = state == self.goal
 
@@ -21,6 +21,7 @@
 # For more info, see http://inst.eecs.berkeley.edu/~cs188/sp09/pacman.html
 
 from util import *
+import random
 import time
 import os
 import traceback
@@ -205,6 +206,8 @@ class Grid:
     def __eq__(self, other):
         if other == None:
             return False
+        if isinstance(other, PackedGrid):
+            return other == self
         return self.data == other.data
 
     def __hash__(self):
@@ -293,6 +296,123 @@ class Grid:
         return bools
 
 
+class PackedGrid:
+    """
+    An immutable boolean grid packed into a single Python int, with bit
+    x * height + y holding cell (x,y).  It offers the read side of Grid
+    (grid[x][y], count, asList, width, height) so code written for Grid keeps
+    working, while hashing is O(1) and asList is O(number of True cells).
+
+    "Modifying" a PackedGrid returns a new one; see withoutCell.  copy() and
+    deepCopy() return a mutable Grid, like toGrid().
+    """
+    __slots__ = ('width', 'height', 'bits', '_hash')
+
+    def __init__(self, width, height, bits=0):
+        self.width = width
+        self.height = height
+        self.bits = bits
+        self._hash = hash(bits)
+
+    def fromGrid(grid):
+        "Packs the True cells of a Grid (or PackedGrid) into a PackedGrid."
+        if isinstance(grid, PackedGrid): return grid
+        bits = 0
+        index = 0
+        for column in grid.data:
+            for cell in column:
+                if cell: bits |= 1 << index
+                index += 1
+        return PackedGrid(grid.width, grid.height, bits)
+    fromGrid = staticmethod(fromGrid)
+
+    def __getitem__(self, x):
+        if not 0 <= x < self.width:
+            raise IndexError('PackedGrid column %s out of range' % x)
+        return _PackedColumn(self.bits >> (x * self.height), self.height)
+
+    def __str__(self):
+        out = [[str(self[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def __eq__(self, other):
+        # A Grid with the same cells is equal, and Grid.__hash__ agrees
+        if isinstance(other, Grid): other = PackedGrid.fromGrid(other)
+        elif not isinstance(other, PackedGrid): return False
+        return self.bits == other.bits and self.height == other.height and self.width == other.width
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self._hash
+
+    def copy(self):
+        "Returns a mutable Grid, so the Grid idiom of copying and then setting cells works."
+        return self.toGrid()
+
+    def deepCopy(self):
+        return self.toGrid()
+
+    def shallowCopy(self):
+        "Returns self: a PackedGrid cannot change, so sharing it is safe."
+        return self
+
+    def isSet(self, x, y):
+        return (self.bits >> (x * self.height + y)) & 1 == 1
+
+    def withoutCell(self, x, y):
+        "Returns a PackedGrid with (x,y) cleared, or self if it was already False."
+        mask = 1 << (x * self.height + y)
+        if not self.bits & mask: return self
+        return PackedGrid(self.width, self.height, self.bits & ~mask)
+
+    def withCell(self, x, y):
+        "Returns a PackedGrid with (x,y) set, or self if it was already True."
+        mask = 1 << (x * self.height + y)
+        if self.bits & mask: return self
+        return PackedGrid(self.width, self.height, self.bits | mask)
+
+    def count(self, item=True):
+        ones = bin(self.bits).count('1')
+        if item: return ones
+        return self.width * self.height - ones
+
+    def asList(self, key=True):
+        if not key:
+            return [(x, y) for x in range(self.width) for y in range(self.height) if not self.isSet(x, y)]
+        cells = []
+        height = self.height
+        bits = self.bits
+        while bits:
+            low = bits & -bits
+            index = low.bit_length() - 1
+            cells.append((index // height, index % height))
+            bits ^= low
+        return cells
+
+    def toGrid(self):
+        "Returns a mutable Grid with the same contents."
+        g = Grid(self.width, self.height)
+        for x, y in self.asList():
+            g[x][y] = True
+        return g
+
+class _PackedColumn:
+    "Read-only view of one PackedGrid column, so that grid[x][y] works."
+    __slots__ = ('bits', 'height')
+
+    def __init__(self, bits, height):
+        self.bits = bits
+        self.height = height
+
+    def __getitem__(self, y):
+        # Unchecked, y past the top would read the next column's bits
+        if not 0 <= y < self.height:
+            raise IndexError('PackedGrid row %s out of range' % y)
+        return (self.bits >> y) & 1 == 1
+
 def reconstituteGrid(bitRep):
     if type(bitRep) is not type((1, 2)):
         return bitRep
@@ -393,16 +513,63 @@ class Actions:
     getSuccessor = staticmethod(getSuccessor)
 
 
+ZOBRIST_SEED = 188
+
+class ZobristKeys:
+    """
+    Random 64-bit keys for the features of a game state: one per (agent,
+    position, direction, scared timer), per food cell and per capsule.  The
+    hash of a state is the XOR of the keys of its features, so a move
+    updates it by XORing out the old features and XORing in the new ones.
+
+    Keys are drawn the first time a feature is seen (ghost positions can be
+    fractional, so they cannot all be listed up front).  They are fixed for
+    the life of the process but not between processes.
+    """
+    def __init__(self, seed=ZOBRIST_SEED):
+        self.random = random.Random(seed)
+        self.keys = {}
+
+    def key(self, feature):
+        key = self.keys.get(feature)
+        if key is None:
+            key = self.keys[feature] = self.random.getrandbits(64)
+        return key
+
+    def agentKey(self, agentIndex, agentState):
+        config = agentState.configuration
+        if config == None:
+            return 0
+        return self.key(('agent', agentIndex, config.pos, config.direction, agentState.scaredTimer))
+
+    def foodKey(self, x, y):
+        return self.key(('food', x, y))
+
+    def capsuleKey(self, position):
+        return self.key(('capsule', position))
+
+zobristKeys = ZobristKeys()
+
+
 class GameStateData:
 
     def __init__(self, prevState=None):
         """
         Generates a new data packet by copying information from its predecessor.
+
+        The copy is shallow: the food PackedGrid, the capsule list and every
+        AgentState are shared with prevState until they change.  Code that
+        modifies an agent gets it from getAgentStateForUpdate, food and
+        capsules are replaced rather than edited (see PacmanRules.consume).
         """
         if prevState != None:
             self.food = prevState.food.shallowCopy()
-            self.capsules = prevState.capsules[:]
-            self.agentStates = self.copyAgentStates(prevState.agentStates)
+            self.numFood = prevState.numFood
+            self.capsules = prevState.capsules
+            self.agentStates = prevState.agentStates[:]
+            self._ownedAgents = 0 # Bit i set once agentStates[i] is our own copy
+            self._zobrist = prevState.getZobristHash()
+            self._dirtyAgents = 0 # Bit i set while agent i's key is out of _zobrist
             self.layout = prevState.layout
             self._eaten = prevState._eaten
             self.score = prevState.score
@@ -418,6 +585,9 @@ class GameStateData:
     def deepCopy(self):
         state = GameStateData(self)
         state.food = self.food.deepCopy()
+        state.capsules = self.capsules[:]
+        state.agentStates = self.copyAgentStates(self.agentStates)
+        state._ownedAgents = -1
         state.layout = self.layout.deepCopy()
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
@@ -431,6 +601,59 @@ class GameStateData:
             copiedStates.append(agentState.copy())
         return copiedStates
 
+    def getAgentStateForUpdate(self, agentIndex):
+        """
+        Returns agentStates[agentIndex] for modification, first copying it if
+        it is still shared with the state this one was generated from.  The
+        agent's Zobrist key is taken out of the hash until the next
+        getZobristHash, which adds the key of its new position and timer.
+        """
+        if not (self._dirtyAgents >> agentIndex) & 1:
+            self._zobrist ^= zobristKeys.agentKey(agentIndex, self.agentStates[agentIndex])
+            self._dirtyAgents |= 1 << agentIndex
+        if not (self._ownedAgents >> agentIndex) & 1:
+            self.agentStates[agentIndex] = self.agentStates[agentIndex].copy()
+            self._ownedAgents |= 1 << agentIndex
+        return self.agentStates[agentIndex]
+
+    def removeFood(self, x, y):
+        "Eats the food at (x,y), which must be there."
+        self.food = self.food.withoutCell(x, y)
+        self.numFood -= 1
+        self._zobrist ^= zobristKeys.foodKey(x, y)
+
+    def removeCapsule(self, position):
+        "Eats the capsule at position, leaving the (shared) old list alone."
+        self.capsules = [c for c in self.capsules if c != position]
+        self._zobrist ^= zobristKeys.capsuleKey(position)
+
+    def getZobristHash(self):
+        """
+        The XOR of the Zobrist keys of the agents, food and capsules (see
+        ZobristKeys), maintained as the rules change the state.
+        """
+        dirty = self._dirtyAgents
+        if dirty:
+            index = 0
+            while dirty:
+                if dirty & 1:
+                    self._zobrist ^= zobristKeys.agentKey(index, self.agentStates[index])
+                dirty >>= 1
+                index += 1
+            self._dirtyAgents = 0
+        return self._zobrist
+
+    def computeZobristHash(self):
+        "Computes the Zobrist hash from scratch, in time linear in the board."
+        h = 0
+        for index, agentState in enumerate(self.agentStates):
+            h ^= zobristKeys.agentKey(index, agentState)
+        for x, y in self.food.asList():
+            h ^= zobristKeys.foodKey(x, y)
+        for position in self.capsules:
+            h ^= zobristKeys.capsuleKey(position)
+        return h
+
     def __eq__(self, other):
         """
         Allows two states to be compared.
@@ -438,6 +661,9 @@ class GameStateData:
         if other == None:
             return False
         # TODO Check for type of other
+        # Equal states always have equal Zobrist hashes
+        if self.getZobristHash() != other.getZobristHash():
+            return False
         if not self.agentStates == other.agentStates:
             return False
         if not self.food == other.food:
@@ -450,15 +676,10 @@ class GameStateData:
 
     def __hash__(self):
         """
-        Allows states to be keys of dictionaries.
+        Allows states to be keys of dictionaries.  Constant time: the Zobrist
+        hash is kept up to date as the state changes.
         """
-        for i, state in enumerate(self.agentStates):
-            try:
-                int(hash(state))
-            except TypeError as e:
-                print(e)
-                # hash(state)
-        return int((hash(tuple(self.agentStates)) + 13*hash(self.food) + 113 * hash(tuple(self.capsules)) + 7 * hash(self.score)) % 1048575)
+        return hash((self.getZobristHash(), self.score))
 
     def __str__(self):
         width, height = self.layout.width, self.layout.height
@@ -518,7 +739,8 @@ class GameStateData:
         """
         Creates an initial game state from a layout array (see layout.py).
         """
-        self.food = layout.food.copy()
+        self.food = PackedGrid.fromGrid(layout.food)
+        self.numFood = self.food.count()
         #self.capsules = []
         self.capsules = layout.capsules[:]
         self.layout = layout
@@ -535,6 +757,9 @@ class GameStateData:
                     numGhosts += 1
             self.agentStates.append(AgentState(
                 Configuration(pos, Directions.STOP), isPacman))
+        self._ownedAgents = -1 # All bits set: every AgentState is our own
+        self._dirtyAgents = 0
+        self._zobrist = self.computeZobristHash()
         self._eaten = [False for a in self.agentStates]
 
 
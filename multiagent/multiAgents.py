@@ -14,7 +14,7 @@
 
 from util import manhattanDistance
 from game import Directions
-import random, util, math
+import random, util, math, collections, time
 
 from game import Agent
 
@@ -101,6 +101,12 @@ def scoreEvaluationFunction(currentGameState):
     """
     return currentGameState.getScore()
 
+MAX_DEPTH = 50 # Deepest iteration of iterativeDeepening
+
+class SearchTimeout(Exception):
+    "Raised inside a search when iterativeDeepening's time budget is spent."
+    pass
+
 class MultiAgentSearchAgent(Agent):
     """
     This class provides some common elements to all of your
@@ -114,12 +120,74 @@ class MultiAgentSearchAgent(Agent):
     Note: this is an abstract class: one that should not be instantiated.  It's
     only partially specified, and designed to be extended.  Agent (game.py)
     is another abstract class.
+
+    With a timeBudget in seconds, depth is ignored: each move is searched by
+    iterative deepening until the budget is spent (see iterativeDeepening).
+
+    > python pacman.py -p AlphaBetaAgent -a timeBudget=0.5,table=True,ordering=True -l mediumClassic
     """
 
-    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2'):
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', timeBudget = '0',
+                 maxDepth = str(MAX_DEPTH)):
         self.index = 0 # Pacman is always agent index 0
         self.evaluationFunction = util.lookup(evalFn, globals())
         self.depth = int(depth)
+        self.timeBudget = float(timeBudget)
+        self.maxDepth = int(maxDepth)
+        self.deadline = None       # Set while a deepening iteration may be cut short
+        self.previousBest = None   # Best move of the last completed iteration
+        self.completedDepth = None # Depth of the move iterativeDeepening returned
+
+    def fixedDepthAction(self, gameState):
+        "Returns the best action searching self.depth rounds of moves."
+        util.raiseNotDefined()
+
+    def iterativeDeepening(self, gameState):
+        """
+        Searches to depth 1, 2, 3, ... until timeBudget seconds have passed (or
+        maxDepth is reached) and returns the best action of the deepest search
+        that finished.  Each search tries the previous one's best move first.
+
+        Depth 1 always finishes.  Deeper searches give up as soon as the budget
+        runs out, and are not started when the last search took longer than
+        the time left, since the next one would take longer still.  Keep the
+        budget below the game's move timeout (ClassicGameRules.getMoveTimeout).
+        """
+        budgetEnd = time.time() + self.timeBudget
+        savedDepth = self.depth
+        bestAction = None
+        self.previousBest = None
+        try:
+            for depth in range(1, max(self.maxDepth, 1) + 1):
+                self.depth = depth
+                iterationStart = time.time()
+                try:
+                    action = self.fixedDepthAction(gameState)
+                except SearchTimeout:
+                    break
+                bestAction = self.previousBest = action
+                self.completedDepth = depth
+                self.deadline = budgetEnd
+                now = time.time()
+                if now + (now - iterationStart) >= budgetEnd:
+                    break
+        finally:
+            self.depth = savedDepth
+            self.deadline = None
+            self.previousBest = None
+        return bestAction
+
+    def checkTime(self):
+        if self.deadline is not None and time.time() > self.deadline:
+            raise SearchTimeout()
+
+    def rootActions(self, gameState):
+        "Pacman's legal actions, with the last iteration's best move first."
+        legalActions = gameState.getLegalActions(0)
+        if self.previousBest in legalActions:
+            legalActions.remove(self.previousBest)
+            legalActions.insert(0, self.previousBest)
+        return legalActions
 
 class MinimaxAgent(MultiAgentSearchAgent):
     """
@@ -150,7 +218,12 @@ class MinimaxAgent(MultiAgentSearchAgent):
         Returns whether or not the game state is a losing state
         """
         "*** YOUR CODE HERE ***"
-        legalActions = gameState.getLegalActions(0)
+        if self.timeBudget:
+            return self.iterativeDeepening(gameState)
+        return self.fixedDepthAction(gameState)
+
+    def fixedDepthAction(self, gameState):
+        legalActions = self.rootActions(gameState)
         successors = [gameState.generateSuccessor(0, action) for action in legalActions]
         results = [self.minimize(successor, 0, 1) for successor in successors]
         maxIndex = results.index(max(results))
@@ -160,6 +233,7 @@ class MinimaxAgent(MultiAgentSearchAgent):
         if depth == self.depth or gameState.isLose() or gameState.isWin():
             return self.evaluationFunction(gameState)
 
+        self.checkTime()
         legalActions = gameState.getLegalActions(0)
         successors = [gameState.generateSuccessor(0, action) for action in legalActions]
         results = [self.minimize(successor, depth, 1) for successor in successors]
@@ -169,6 +243,7 @@ class MinimaxAgent(MultiAgentSearchAgent):
         if depth == self.depth or gameState.isLose() or gameState.isWin():
             return self.evaluationFunction(gameState)
         
+        self.checkTime()
         legalActions = gameState.getLegalActions(agent)
         successors = [gameState.generateSuccessor(agent, action) for action in legalActions]
         if agent == gameState.getNumAgents() - 1:
@@ -178,24 +253,104 @@ class MinimaxAgent(MultiAgentSearchAgent):
         return min(results)
 
 
+TABLE_SIZE = 200000          # Transposition table entries kept by AlphaBetaAgent
+TABLE_EXACT, TABLE_LOWER, TABLE_UPPER = 0, 1, 2
+ORDER_BY_EVAL_MIN_PLIES = 6  # Order by evaluationFunction only where at least this many plies remain
+NUM_KILLERS = 2              # Killer moves remembered per ply
+
 class AlphaBetaAgent(MultiAgentSearchAgent):
     """
     Your minimax agent with alpha-beta pruning (question 3)
+
+    Two optional speedups search fewer nodes and still return a move with the
+    same minimax value (ties may break differently).
+
+    table=True keeps a transposition table. It maps (agent to move, state) to
+    the value found with a given number of plies left, whether that value is
+    exact or a bound, and the best move. A state reached again, for example
+    through ghost moves made in another order, is looked up instead of
+    searched again. The table keeps its entries between moves and drops the
+    oldest once it holds tableSize of them.
+
+    ordering=True tries the likeliest cutoffs first. The order is: the
+    table's best move, then this ply's killer moves (recent cutoffs), then
+    moves with a high history score (cutoffs anywhere, weighted by depth).
+    Where enough plies remain, ties are broken by evaluationFunction on the
+    successor.
+
+    With report=True the nodes searched are printed at the end of each game:
+
+    > python pacman.py -p AlphaBetaAgent -a depth=3,table=True,ordering=True,report=True -l smallClassic -q
+
+    Without either option this is the plain search the autograder checks.
     """
 
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', table = 'False',
+                 ordering = 'False', tableSize = str(TABLE_SIZE), report = 'False',
+                 timeBudget = '0', maxDepth = str(MAX_DEPTH)):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth, timeBudget, maxDepth)
+        self.useTable = table == True or str(table).lower() == 'true'
+        self.useOrdering = ordering == True or str(ordering).lower() == 'true'
+        self.report = report == True or str(report).lower() == 'true'
+        self.tableSize = int(tableSize)
+        self.table = collections.OrderedDict()
+        self.killers = {}  # ply -> recent actions that caused a cutoff there
+        self.history = {}  # (agent, action) -> cutoff score
+        self.moveStats = self.newStats()
+        self.gameStats = self.newStats()
+
+    def newStats(self):
+        """
+        Node counts: expanded nodes had their successors generated, generated
+        counts those successors and tableHits the nodes the table answered.
+        """
+        return {'moves': 0, 'expanded': 0, 'generated': 0, 'tableHits': 0, 'depth': 0}
+
     def getAction(self, gameState):
         """
         Returns the minimax action using self.depth and self.evaluationFunction
         """
+        self.moveStats = self.newStats()
+        if self.timeBudget:
+            bestAction = self.iterativeDeepening(gameState)
+            self.moveStats['depth'] = self.completedDepth
+        else:
+            bestAction = self.fixedDepthAction(gameState)
+            self.moveStats['depth'] = self.depth
+        self.moveStats['moves'] = 1
+        for key, value in self.moveStats.items():
+            self.gameStats[key] += value
+        return bestAction
+
+    def fixedDepthAction(self, gameState):
+        if self.useTable or self.useOrdering:
+            return self.searchRoot(gameState, self.depth * gameState.getNumAgents())
+        return self.plainAlphaBeta(gameState)
+
+    def final(self, state):
+        if self.report:
+            stats = self.gameStats
+            print('AlphaBetaAgent: %d moves, %d nodes expanded, %d generated, %d table hits, average depth %.1f' %
+                  (stats['moves'], stats['expanded'], stats['generated'], stats['tableHits'],
+                   stats['depth'] / float(max(stats['moves'], 1))))
+        self.gameStats = self.newStats()
+
+    def plainAlphaBeta(self, gameState):
+        """
+        Alpha-beta over successors in getLegalActions order, the search the
+        autograder checks state by state.
+        """
         "*** YOUR CODE HERE ***"
         score = -1 * math.inf
         alpha = -1 * math.inf
         beta = math.inf
         bestAction = []
 
-        legalActions = gameState.getLegalActions(0)
+        self.moveStats['expanded'] += 1
+        legalActions = self.rootActions(gameState)
         for action in legalActions:
             successor = gameState.generateSuccessor(0, action)
+            self.moveStats['generated'] += 1
             actionScore = self.minimize(successor, 0, 1, alpha, beta)
             if actionScore > score:
                 score = actionScore
@@ -207,10 +362,13 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
         if depth == self.depth or gameState.isLose() or gameState.isWin():
             return self.evaluationFunction(gameState)
 
+        self.checkTime()
+        self.moveStats['expanded'] += 1
         legalActions = gameState.getLegalActions(0)
         v = -1 * math.inf
         for action in legalActions:
             successor = gameState.generateSuccessor(0, action)
+            self.moveStats['generated'] += 1
             actionScore = self.minimize(successor, depth, 1, alpha, beta)
             v = max(v, actionScore)
             if v > beta:
@@ -222,10 +380,13 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
         if depth == self.depth or gameState.isLose() or gameState.isWin():
             return self.evaluationFunction(gameState)
 
+        self.checkTime()
+        self.moveStats['expanded'] += 1
         legalActions = gameState.getLegalActions(agent)
         v = math.inf
         for action in legalActions:
             successor = gameState.generateSuccessor(agent, action)
+            self.moveStats['generated'] += 1
             if agent == gameState.getNumAgents() - 1:
                 value = self.maximize(successor, depth + 1, alpha, beta)
             else:
@@ -236,6 +397,133 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
             beta = min(beta, v)
         return v
 
+    def searchRoot(self, gameState, plies):
+        """
+        Returns Pacman's best action with plies single-agent moves to go (depth
+        times the number of agents), using the table and move ordering.
+        """
+        self.killers = {}
+        for key in self.history: # Old cutoffs still count, but less
+            self.history[key] //= 2
+        numAgents = gameState.getNumAgents()
+        entry = self.table.get((0, gameState)) if self.useTable else None
+        successors = self.expand(gameState, 0, plies, 0, self.previousBest or (entry and entry[3]))
+        alpha = -1 * math.inf
+        bestAction = None
+        for action, successor in successors:
+            value = self.tableSearch(successor, 1 % numAgents, plies - 1, alpha, math.inf, 1)
+            if value > alpha or bestAction is None:
+                alpha = value
+                bestAction = action
+        self.store(gameState, 0, plies, alpha, TABLE_EXACT, bestAction)
+        return bestAction
+
+    def tableSearch(self, gameState, agent, plies, alpha, beta, ply):
+        """
+        Fail-soft alpha-beta over single-agent plies.  Like maximize and
+        minimize it only prunes on strict inequalities.  A returned value no
+        greater than alpha is an upper bound and one no less than beta is a
+        lower bound; anything between is exact.
+        """
+        if plies == 0 or gameState.isLose() or gameState.isWin():
+            return self.evaluationFunction(gameState)
+
+        entry = self.table.get((agent, gameState)) if self.useTable else None
+        tableAction = None
+        if entry is not None:
+            tableAction = entry[3]
+            value, flag = entry[1], entry[2]
+            if entry[0] == plies and (flag == TABLE_EXACT or (flag == TABLE_LOWER and value > beta) or
+                                      (flag == TABLE_UPPER and value < alpha)):
+                self.moveStats['tableHits'] += 1
+                return value
+
+        successors = self.expand(gameState, agent, plies, ply, tableAction)
+        nextAgent = (agent + 1) % gameState.getNumAgents()
+        maximizing = agent == 0
+        alpha0, beta0 = alpha, beta
+        v = -1 * math.inf if maximizing else math.inf
+        bestAction = None
+        for action, successor in successors:
+            value = self.tableSearch(successor, nextAgent, plies - 1, alpha, beta, ply + 1)
+            if maximizing:
+                if value > v or bestAction is None:
+                    v, bestAction = value, action
+                if v > beta:
+                    self.recordCutoff(agent, action, plies, ply)
+                    break
+                alpha = max(alpha, v)
+            else:
+                if value < v or bestAction is None:
+                    v, bestAction = value, action
+                if v < alpha:
+                    self.recordCutoff(agent, action, plies, ply)
+                    break
+                beta = min(beta, v)
+
+        if v <= alpha0:
+            flag = TABLE_UPPER
+        elif v >= beta0:
+            flag = TABLE_LOWER
+        else:
+            flag = TABLE_EXACT
+        self.store(gameState, agent, plies, v, flag, bestAction)
+        return v
+
+    def expand(self, gameState, agent, plies, ply, tableAction=None):
+        """
+        The (action, successor) pairs of gameState.  The table's best move
+        comes first; with ordering the rest are sorted best first too.
+        """
+        self.checkTime()
+        self.moveStats['expanded'] += 1
+        successors = [(action, gameState.generateSuccessor(agent, action))
+                      for action in gameState.getLegalActions(agent)]
+        self.moveStats['generated'] += len(successors)
+        if not self.useOrdering:
+            if tableAction is not None:
+                successors.sort(key=lambda item: item[0] != tableAction)
+            return successors
+
+        killers = self.killers.get(ply, ())
+        history = self.history
+        sign = 1 if agent == 0 else -1 # Ghosts try the successors Pacman likes least first
+        byEval = plies >= ORDER_BY_EVAL_MIN_PLIES
+        evaluate = self.evaluationFunction
+        def priority(item):
+            action, successor = item
+            return (action == tableAction, action in killers, history.get((agent, action), 0),
+                    sign * evaluate(successor) if byEval else 0)
+        successors.sort(key=priority, reverse=True)
+        return successors
+
+    def recordCutoff(self, agent, action, plies, ply):
+        if not self.useOrdering:
+            return
+        killers = self.killers.setdefault(ply, [])
+        if action not in killers:
+            killers.insert(0, action)
+            del killers[NUM_KILLERS:]
+        key = (agent, action)
+        self.history[key] = self.history.get(key, 0) + plies * plies
+
+    def store(self, gameState, agent, plies, value, flag, action):
+        """
+        Keeps the deeper of the new and any existing entry for the state; when
+        the table is full the oldest entry makes room.
+        """
+        if not self.useTable:
+            return
+        key = (agent, gameState)
+        old = self.table.get(key)
+        if old is not None:
+            if old[0] > plies:
+                return
+            del self.table[key]
+        elif len(self.table) >= self.tableSize:
+            self.table.popitem(last=False)
+        self.table[key] = (plies, value, flag, action)
+
 class ExpectimaxAgent(MultiAgentSearchAgent):
     """
       Your expectimax agent (question 4)
@@ -249,7 +537,12 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
         legal moves.
         """
         "*** YOUR CODE HERE ***"
-        legalActions = gameState.getLegalActions(0)
+        if self.timeBudget:
+            return self.iterativeDeepening(gameState)
+        return self.fixedDepthAction(gameState)
+
+    def fixedDepthAction(self, gameState):
+        legalActions = self.rootActions(gameState)
         successors = [gameState.generateSuccessor(0, action) for action in legalActions]
         results = [self.calcExpected(successor, 0, 1) for successor in successors]
         maxIndex = results.index(max(results))
@@ -259,6 +552,7 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
         if depth == self.depth or gameState.isLose() or gameState.isWin():
             return self.evaluationFunction(gameState)
 
+        self.checkTime()
         legalActions = gameState.getLegalActions(agent)
         successors = [gameState.generateSuccessor(agent, action) for action in legalActions]
         numAgents = gameState.getNumAgents()
@@ -158,6 +158,18 @@ def run(lay, layName, pac, ghosts, disp, nGames=1, name='games'):
     return stats
 
 
+def runTrackingExplored(*args, **kwargs):
+    """
+    Calls run with GameState's explored tracking in set mode, for the agents
+    below that check how many states each move explores.
+    """
+    previousMode = GameState.setExploredTracking('set')
+    try:
+        return run(*args, **kwargs)
+    finally:
+        GameState.setExploredTracking(previousMode)
+
+
 class GradingAgent(Agent):
     def __init__(self, seed, studentAgent, optimalActions, altDepthActions, partialPlyBugActions):
         # save student agent and actions of refernce agents
@@ -345,7 +357,7 @@ class PacmanGameTreeTest(testClasses.TestCase):
                            altDepthActions, partialPlyBugActions)
         # check return codes and assign grades
         disp = self.question.getDisplay()
-        stats = run(lay, self.layout_name, pac, [DirectionalGhost(
+        stats = runTrackingExplored(lay, self.layout_name, pac, [DirectionalGhost(
             i + 1) for i in range(2)], disp, name=self.alg)
         if stats['timeouts'] > 0:
             self.addMessage('Agent timed out on smallClassic.  No credit')
@@ -395,7 +407,7 @@ class PacmanGameTreeTest(testClasses.TestCase):
             ourPacOptions = {}
         pac = PolyAgent(self.seed, multiAgents, ourPacOptions, self.depth)
         disp = self.question.getDisplay()
-        run(lay, self.layout_name, pac, [DirectionalGhost(
+        runTrackingExplored(lay, self.layout_name, pac, [DirectionalGhost(
             i + 1) for i in range(2)], disp, name=self.alg)
         (optimalActions, altDepthActions, partialPlyBugActions) = pac.getTraces()
         # recover traces and record to file
@@ -16,6 +16,7 @@
 
 from game import Directions, Actions
 import util
+import distanceOracle
 
 class FeatureExtractor:
     def getFeatures(self, state, action):
@@ -43,25 +44,11 @@ class CoordinateExtractor(FeatureExtractor):
 
 def closestFood(pos, food, walls):
     """
-    closestFood -- this is similar to the function that we have
-    worked on in the search project; here its all in one place
+    closestFood -- returns the maze distance from pos to the nearest food,
+    or None if no food can be reached, using the shared DistanceOracle
     """
-    fringe = [(pos[0], pos[1], 0)]
-    expanded = set()
-    while fringe:
-        pos_x, pos_y, dist = fringe.pop(0)
-        if (pos_x, pos_y) in expanded:
-            continue
-        expanded.add((pos_x, pos_y))
-        # if we find a food at this location then exit
-        if food[pos_x][pos_y]:
-            return dist
-        # otherwise spread out from the location to its neighbours
-        nbrs = Actions.getLegalNeighbors((pos_x, pos_y), walls)
-        for nbr_x, nbr_y in nbrs:
-            fringe.append((nbr_x, nbr_y, dist+1))
-    # no food found
-    return None
+    dist, _ = distanceOracle.getDistanceOracle(walls).getNearest(pos, food.asList())
+    return dist
 
 class SimpleExtractor(FeatureExtractor):
     """
@@ -202,40 +202,95 @@ class Queue:
         return len(self.list) == 0
 
 
+_REMOVED = object() # Marks heap entries superseded by PriorityQueue.update
+
 class PriorityQueue:
     """
     Implements a priority queue data structure. Each inserted item
     has a priority associated with it and the client is usually interested
     in quick retrieval of the lowest-priority item in the queue. This
-    data structure allows O(1) access to the lowest-priority item.
+    data structure allows O(1) access to the lowest-priority item
+    and O(log n) push, pop and update.
     """
 
     def __init__(self):
         self.heap = []
         self.count = 0
+        # Maps each item to its live heap entry so update() can find it in
+        # O(1).  Superseded entries stay in the heap marked as _REMOVED and
+        # are discarded lazily when they reach the top.
+        self.entryFinder = {}
+        # Set once push() gives an item a second live entry.  update() then
+        # has to choose between them as the original linear scan did, so the
+        # queue drops entryFinder and goes back to scanning the heap.
+        self.scanning = False
 
     def push(self, item, priority):
-        entry = (priority, self.count, item)
-        heapq.heappush(self.heap, entry)
+        entry = [priority, self.count, item]
         self.count += 1
+        if not self.scanning:
+            try:
+                if item in self.entryFinder:
+                    self._startScanning()
+                else:
+                    self.entryFinder[item] = entry
+            except TypeError:
+                pass # Unhashable items are handled by a linear scan in update
+        heapq.heappush(self.heap, entry)
 
     def pop(self):
-        (_, _, item) = heapq.heappop(self.heap)
+        while True:
+            entry = heapq.heappop(self.heap)
+            item = entry[2]
+            if item is not _REMOVED:
+                break
+        if not self.scanning:
+            try:
+                if self.entryFinder.get(item) is entry:
+                    del self.entryFinder[item]
+            except TypeError:
+                pass
         return item
 
     def isEmpty(self):
+        while self.heap and self.heap[0][2] is _REMOVED:
+            heapq.heappop(self.heap)
         return len(self.heap) == 0
 
     def update(self, item, priority):
-        # If item already in priority queue with higher priority, update its priority and rebuild the heap.
+        # If item already in priority queue with higher priority, update its priority.
         # If item already in priority queue with equal or lower priority, do nothing.
         # If item not in priority queue, do the same thing as self.push.
+        if self.scanning:
+            return self._updateByScan(item, priority)
+        try:
+            entry = self.entryFinder.get(item)
+        except TypeError:
+            return self._updateByScan(item, priority)
+        if entry is None:
+            self.push(item, priority)
+        elif priority < entry[0]:
+            # Keep the original insertion count so ties break as before
+            entry[2] = _REMOVED
+            newEntry = [priority, entry[1], item]
+            self.entryFinder[item] = newEntry
+            heapq.heappush(self.heap, newEntry)
+
+    def _startScanning(self):
+        self.scanning = True
+        self.entryFinder = {}
+        live = [entry for entry in self.heap if entry[2] is not _REMOVED]
+        if len(live) < len(self.heap):
+            heapq.heapify(live)
+            self.heap = live
+
+    def _updateByScan(self, item, priority):
         for index, (p, c, i) in enumerate(self.heap):
             if i == item:
                 if p <= priority:
                     break
                 del self.heap[index]
-                self.heap.append((priority, c, item))
+                self.heap.append([priority, c, item])
                 heapq.heapify(self.heap)
                 break
         else:
@@ -0,0 +1,287 @@
+# batchSolve.py
+# -------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Solves many search problems at once on a pool of worker processes.  A job
+names a layout, a problem type from searchAgents.py, a search function from
+search.py and optionally a heuristic and a start position for Pacman:
+
+  {"layout": "bigMaze", "problem": "PositionSearchProblem",
+   "algorithm": "astar", "heuristic": "manhattanHeuristic", "start": [5, 5]}
+
+Jobs are read as JSON lines from a file, or built from every combination of
+the -l, -p, -a and -H options (with --all-starts, once for every open cell of
+each layout).  Each result is written as one JSON line as soon as its job
+finishes, so results arrive in completion order; the "job" field gives the
+job's position in the input.
+
+> python batchSolve.py -l tinyMaze,mediumMaze,bigMaze -a bfs,astar -H manhattanHeuristic
+> python batchSolve.py -j jobs.jsonl -w 8 -t 60 -o results.jsonl --plans
+
+A job still running after --timeout seconds is interrupted and reported with
+status 'timeout'; a job that raises is reported with status 'error'.  Without
+signal.setitimer (on Windows) the jobs run one per worker at a time and the
+pool is replaced whenever one of them times out.  Workers refuse to import
+the display modules, so this runs on machines without Tk.
+"""
+
+import contextlib
+import io
+import json
+import multiprocessing
+import signal
+import sys
+import time
+import traceback
+
+DISPLAY_MODULES = ['graphicsDisplay', 'graphicsUtils', 'textDisplay']
+
+class JobTimeout(Exception):
+    pass
+
+def _raiseTimeout(signum, frame):
+    raise JobTimeout()
+
+def _initWorker():
+    """
+    Runs once in each worker.  Marking the display modules as missing makes
+    any attempt to import them fail instead of opening a window.
+    """
+    for name in DISPLAY_MODULES:
+        sys.modules[name] = None
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # Let the parent handle Ctrl-C
+    if hasattr(signal, 'SIGALRM'):
+        signal.signal(signal.SIGALRM, _raiseTimeout)
+
+def _startState(layoutName, start):
+    import game
+    import layout
+    import pacman
+    theLayout = layout.getLayout(layoutName)
+    if theLayout is None:
+        raise Exception('The layout ' + layoutName + ' cannot be found')
+    gameState = pacman.GameState()
+    gameState.initialize(theLayout, 0)
+    if start is not None:
+        x, y = start
+        if gameState.hasWall(x, y):
+            raise Exception('The start %s is a wall' % str(tuple(start)))
+        gameState.data.agentStates[0].configuration = game.Configuration((x, y), game.Directions.STOP)
+    return gameState
+
+def _searchFunction(algorithm, heuristic):
+    import search
+    import searchAgents
+    if algorithm not in dir(search):
+        raise Exception('Unknown search function: ' + algorithm)
+    func = getattr(search, algorithm)
+    if heuristic is None or 'heuristic' not in func.__code__.co_varnames:
+        return func
+    heuristicModule = searchAgents if heuristic in dir(searchAgents) else search
+    if heuristic not in dir(heuristicModule):
+        raise Exception('Unknown heuristic: ' + heuristic)
+    return lambda problem: func(problem, heuristic=getattr(heuristicModule, heuristic))
+
+def _newResult(job):
+    result = dict(job)
+    result.update({'status': 'ok', 'time': None, 'cost': None, 'length': None,
+                   'expanded': None, 'stats': None, 'error': None})
+    return result
+
+def runJob(job, timeout=None, includePlan=False):
+    """
+    Solves one job, a dict as described at the top of this file, and returns
+    its result dict: the job's fields plus status, time, cost, length,
+    expanded and the SearchStats of the run (and the plan with includePlan).
+    Never raises; failures are reported in the status and error fields.
+    """
+    import search
+    import searchAgents
+    result = _newResult(job)
+    useAlarm = timeout and hasattr(signal, 'setitimer')
+    start = time.perf_counter()
+    try:
+        if useAlarm:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                gameState = _startState(job['layout'], job.get('start'))
+                problemName = job.get('problem', 'PositionSearchProblem')
+                if problemName not in dir(searchAgents) or not problemName.endswith('Problem'):
+                    raise Exception('Unknown problem type: ' + problemName)
+                problem = getattr(searchAgents, problemName)(gameState)
+                searchFunction = _searchFunction(job.get('algorithm', 'bfs'), job.get('heuristic'))
+                actions, stats = search.instrumentedSearch(searchFunction, problem)
+        finally:
+            if useAlarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except JobTimeout:
+        result['status'] = 'timeout'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = ''.join(traceback.format_exception_only(type(e), e)).strip()
+    else:
+        result['cost'] = problem.getCostOfActions(actions)
+        result['length'] = len(actions)
+        if '_expanded' in dir(problem): result['expanded'] = problem._expanded
+        result['stats'] = stats.asDict()
+        if includePlan: result['plan'] = list(actions)
+    result['time'] = round(time.perf_counter() - start, 6)
+    return result
+
+def _runIndexedJob(args):
+    index, job, timeout, includePlan = args
+    result = runJob(job, timeout, includePlan)
+    result['job'] = index
+    return result
+
+def solveBatch(jobs, workers=None, timeout=30.0, includePlans=False):
+    """
+    Solves jobs on a pool of worker processes (one per CPU by default) and
+    yields each result as soon as it is ready.
+    """
+    tasks = [(index, job, timeout, includePlans) for index, job in enumerate(jobs)]
+    if timeout and not hasattr(signal, 'setitimer'):
+        for result in _solveInRounds(tasks, workers, timeout):
+            yield result
+        return
+    pool = multiprocessing.Pool(workers, initializer=_initWorker)
+    try:
+        for result in pool.imap_unordered(_runIndexedJob, tasks):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+def _solveInRounds(tasks, workers, timeout):
+    """
+    Where there is no signal.setitimer (Windows), workers cannot interrupt
+    their own jobs, so the parent does: it hands out one job per worker at a
+    time and, when a round outlives timeout, reports the jobs still running
+    as timeouts and replaces the pool.  Results come in job order within
+    each round.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    pool = None
+    try:
+        for first in range(0, len(tasks), workers):
+            if pool is None:
+                pool = multiprocessing.Pool(workers, initializer=_initWorker)
+            running = [(task, pool.apply_async(_runIndexedJob, (task,)))
+                       for task in tasks[first:first + workers]]
+            deadline = time.perf_counter() + timeout
+            timedOut = False
+            for task, pending in running:
+                try:
+                    yield pending.get(max(0, deadline - time.perf_counter()))
+                except multiprocessing.TimeoutError:
+                    timedOut = True
+                    result = _newResult(task[1])
+                    result.update({'status': 'timeout', 'time': timeout, 'job': task[0]})
+                    yield result
+            if timedOut:
+                pool.terminate()
+                pool.join()
+                pool = None
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+def readJobs(path):
+    jobs = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line: jobs.append(json.loads(line))
+    return jobs
+
+def jobCombinations(layoutNames, problems, algorithms, heuristics, allStarts=False):
+    """
+    One job for every combination, and with allStarts for every open cell.
+    Searches that take no heuristic get one job rather than one per heuristic.
+    """
+    import layout
+    import search
+    jobs = []
+    for layoutName in layoutNames:
+        starts = [None]
+        if allStarts:
+            theLayout = layout.getLayout(layoutName)
+            if theLayout is None:
+                raise Exception('The layout ' + layoutName + ' cannot be found')
+            starts = [list(cell) for cell in theLayout.walls.asList(False)]
+        for problem in problems:
+            for algorithm in algorithms:
+                informed = algorithm in dir(search) and \
+                    'heuristic' in getattr(search, algorithm).__code__.co_varnames
+                for heuristic in (heuristics if informed else [None]):
+                    for start in starts:
+                        job = {'layout': layoutName, 'problem': problem, 'algorithm': algorithm}
+                        if heuristic: job['heuristic'] = heuristic
+                        if start is not None: job['start'] = start
+                        jobs.append(job)
+    return jobs
+
+def readCommand(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python batchSolve.py [options]')
+    parser.add_option('-j', '--jobs', dest='jobs', default=None,
+                      help='JSON lines file of jobs; otherwise jobs are built from -l, -p, -a and -H')
+    parser.add_option('-l', '--layouts', dest='layouts', default='tinyMaze,mediumMaze,bigMaze',
+                      help='comma separated layout names [Default: %default]')
+    parser.add_option('-p', '--problems', dest='problems', default='PositionSearchProblem',
+                      help='comma separated problem types [Default: %default]')
+    parser.add_option('-a', '--algorithms', dest='algorithms', default='bfs',
+                      help='comma separated search functions [Default: %default]')
+    parser.add_option('-H', '--heuristics', dest='heuristics', default='',
+                      help='comma separated heuristics for the searches that take one [Default: none]')
+    parser.add_option('--all-starts', dest='allStarts', action='store_true', default=False,
+                      help='solve from every open cell of each layout')
+    parser.add_option('-w', '--workers', dest='workers', type='int', default=None,
+                      help='worker processes [Default: one per CPU]')
+    parser.add_option('-t', '--timeout', dest='timeout', type='float', default=30.0,
+                      help='seconds before a job is interrupted [Default: %default]')
+    parser.add_option('-o', '--output', dest='output', default=None,
+                      help='write the JSON lines to this file instead of standard output')
+    parser.add_option('--plans', dest='plans', action='store_true', default=False,
+                      help='include the list of actions in each result')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+
+    if options.jobs:
+        jobs = readJobs(options.jobs)
+    else:
+        heuristics = options.heuristics.split(',') if options.heuristics else [None]
+        jobs = jobCombinations(options.layouts.split(','), options.problems.split(','),
+                               options.algorithms.split(','), heuristics, options.allStarts)
+    return jobs, options
+
+def main(argv):
+    jobs, options = readCommand(argv)
+    out = open(options.output, 'w') if options.output else sys.stdout
+    failures = 0
+    try:
+        for result in solveBatch(jobs, options.workers, options.timeout, options.plans):
+            if result['status'] != 'ok': failures += 1
+            out.write(json.dumps(result, sort_keys=True) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout: out.close()
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
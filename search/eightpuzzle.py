@@ -12,11 +12,33 @@
 # Pieter Abbeel (pabbeel@cs.berkeley.edu).
 
 
-import search
+import os
 import random
+import search
 
 # Module Classes
 
+MOVES = ('up', 'down', 'left', 'right')
+_MOVE_TABLES = {} # size -> per blank cell, the (move, new blank cell) pairs in MOVES order
+
+def getMoveTable(size):
+    """
+    For a size x size board, returns a list indexed by the blank's cell
+    (row * size + col) of the legal (move, newBlankCell) pairs.
+    """
+    if size not in _MOVE_TABLES:
+        table = []
+        for cell in range(size * size):
+            row, col = divmod(cell, size)
+            moves = []
+            if row != 0: moves.append(('up', cell - size))
+            if row != size - 1: moves.append(('down', cell + size))
+            if col != 0: moves.append(('left', cell - 1))
+            if col != size - 1: moves.append(('right', cell + 1))
+            table.append(tuple(moves))
+        _MOVE_TABLES[size] = table
+    return _MOVE_TABLES[size]
+
 class EightPuzzleState:
     """
     The Eight Puzzle is described in the course textbook on
@@ -25,7 +47,11 @@ class EightPuzzleState:
     This class defines the mechanics of the puzzle itself.  The
     task of recasting this puzzle as a search problem is left to
     the EightPuzzleSearchProblem class.
+
+    Larger square puzzles, such as the 15-puzzle, use the same class: the
+    side of the board is taken from the number of tiles.
     """
+    __slots__ = ('packed', 'blank', 'size')
 
     def __init__( self, numbers ):
         """
@@ -46,18 +72,49 @@ class EightPuzzleState:
             | 6 | 7 | 8 |
             ------------
 
-        The configuration of the puzzle is stored in a 2-dimensional
-        list (a list of lists) 'cells'.
+        A list of 16 integers from 0 to 15 gives a 15-puzzle in the same way.
+
+        The configuration is packed into a single integer 'packed' holding
+        one 4-bit nibble per cell, cell (row, col) at bits 4 * (row * size +
+        col), so copying, hashing and comparing states are integer
+        operations.  'blank' is the cell of the blank.
         """
-        self.cells = []
-        numbers = numbers[:] # Make a copy so as not to cause side-effects.
-        numbers.reverse()
-        for row in range( 3 ):
-            self.cells.append( [] )
-            for col in range( 3 ):
-                self.cells[row].append( numbers.pop() )
-                if self.cells[row][col] == 0:
-                    self.blankLocation = row, col
+        size = int(round(len(numbers) ** 0.5))
+        if size * size != len(numbers) or sorted(numbers) != list(range(len(numbers))) or size > 4:
+            raise Exception('Not a square sliding puzzle of up to 16 tiles: ' + str(numbers))
+        self.size = size
+        self.packed = 0
+        for cell, number in enumerate(numbers):
+            self.packed |= number << (4 * cell)
+            if number == 0:
+                self.blank = cell
+
+    @staticmethod
+    def _fromPacked(packed, blank, size):
+        state = EightPuzzleState.__new__(EightPuzzleState)
+        state.packed = packed
+        state.blank = blank
+        state.size = size
+        return state
+
+    def getNumbers(self):
+        "Returns the tiles as a flat list in row-major order, as passed to the constructor."
+        packed = self.packed
+        numbers = []
+        for cell in range(self.size * self.size):
+            numbers.append(packed & 15)
+            packed >>= 4
+        return numbers
+
+    @property
+    def cells(self):
+        "The configuration as a list of rows, built on demand."
+        numbers = self.getNumbers()
+        return [numbers[row * self.size:(row + 1) * self.size] for row in range(self.size)]
+
+    @property
+    def blankLocation(self):
+        return divmod(self.blank, self.size)
 
     def isGoal( self ):
         """
@@ -77,13 +134,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).isGoal()
         False
         """
-        current = 0
-        for row in range( 3 ):
-            for col in range( 3 ):
-                if current != self.cells[row][col]:
-                    return False
-                current += 1
-        return True
+        return self.packed == getGoalPacked(self.size)
 
     def legalMoves( self ):
         """
@@ -95,17 +146,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8]).legalMoves()
         ['down', 'right']
         """
-        moves = []
-        row, col = self.blankLocation
-        if(row != 0):
-            moves.append('up')
-        if(row != 2):
-            moves.append('down')
-        if(col != 0):
-            moves.append('left')
-        if(col != 2):
-            moves.append('right')
-        return moves
+        return [move for move, newBlank in getMoveTable(self.size)[self.blank]]
 
     def result(self, move):
         """
@@ -113,37 +154,21 @@ class EightPuzzleState:
         updated based on the provided move.
 
         The move should be a string drawn from a list returned by legalMoves.
-        Illegal moves will raise an exception, which may be an array bounds
-        exception.
+        Illegal moves will raise an exception.
 
         NOTE: This function *does not* change the current object.  Instead,
         it returns a new object.
         """
-        row, col = self.blankLocation
-        if(move == 'up'):
-            newrow = row - 1
-            newcol = col
-        elif(move == 'down'):
-            newrow = row + 1
-            newcol = col
-        elif(move == 'left'):
-            newrow = row
-            newcol = col - 1
-        elif(move == 'right'):
-            newrow = row
-            newcol = col + 1
-        else:
-            raise "Illegal Move"
-
-        # Create a copy of the current eightPuzzle
-        newPuzzle = EightPuzzleState([0, 0, 0, 0, 0, 0, 0, 0, 0])
-        newPuzzle.cells = [values[:] for values in self.cells]
-        # And update it to reflect the move
-        newPuzzle.cells[row][col] = self.cells[newrow][newcol]
-        newPuzzle.cells[newrow][newcol] = self.cells[row][col]
-        newPuzzle.blankLocation = newrow, newcol
-
-        return newPuzzle
+        for legalMove, newBlank in getMoveTable(self.size)[self.blank]:
+            if legalMove == move:
+                return self._slide(newBlank)
+        raise Exception("Illegal Move: " + str(move))
+
+    def _slide(self, newBlank):
+        "Moves the tile at cell newBlank into the blank."
+        tile = (self.packed >> (4 * newBlank)) & 15
+        packed = self.packed ^ (tile << (4 * newBlank)) ^ (tile << (4 * self.blank))
+        return EightPuzzleState._fromPacked(packed, newBlank, self.size)
 
     # Utilities for comparison and display
     def __eq__(self, other):
@@ -155,27 +180,28 @@ class EightPuzzleState:
               EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left')
           True
         """
-        for row in range( 3 ):
-            if self.cells[row] != other.cells[row]:
-                return False
-        return True
+        return other is not None and self.packed == other.packed and self.size == other.size
+
+    def __ne__(self, other):
+        return not self == other
 
     def __hash__(self):
-        return hash(str(self.cells))
+        return hash(self.packed)
 
     def __getAsciiString(self):
         """
           Returns a display string for the maze
         """
+        width = len(str(self.size * self.size - 1))
         lines = []
-        horizontalLine = ('-' * (13))
+        horizontalLine = ('-' * (self.size * (width + 3) + 1))
         lines.append(horizontalLine)
         for row in self.cells:
             rowLine = '|'
             for col in row:
                 if col == 0:
                     col = ' '
-                rowLine = rowLine + ' ' + col.__str__() + ' |'
+                rowLine = rowLine + ' ' + str(col).rjust(width) + ' |'
             lines.append(rowLine)
             lines.append(horizontalLine)
         return '\n'.join(lines)
@@ -183,6 +209,17 @@ class EightPuzzleState:
     def __str__(self):
         return self.__getAsciiString()
 
+_GOALS = {}
+
+def getGoalPacked(size):
+    "The packed goal configuration, with the blank first and the tiles in order."
+    if size not in _GOALS:
+        packed = 0
+        for cell in range(size * size):
+            packed |= cell << (4 * cell)
+        _GOALS[size] = packed
+    return _GOALS[size]
+
 # TODO: Implement The methods in this class
 
 class EightPuzzleSearchProblem(search.SearchProblem):
@@ -196,7 +233,7 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         self.puzzle = puzzle
 
     def getStartState(self):
-        return puzzle
+        return self.puzzle
 
     def isGoalState(self,state):
         return state.isGoal()
@@ -208,8 +245,8 @@ class EightPuzzleSearchProblem(search.SearchProblem):
           from the original state and the cost is 1.0 for each
         """
         succ = []
-        for a in state.legalMoves():
-            succ.append((state.result(a), a, 1))
+        for a, newBlank in getMoveTable(state.size)[state.blank]:
+            succ.append((state._slide(newBlank), a, 1))
         return succ
 
     def getCostOfActions(self, actions):
@@ -221,6 +258,193 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         """
         return len(actions)
 
+##########################################
+# PATTERN DATABASES                      #
+##########################################
+
+# Disjoint tile groups for the additive pattern database of each board size.
+# Every tile appears in exactly one group, so the group distances add up to
+# an admissible heuristic.
+PATTERN_GROUPS = {
+    3: ((1, 2, 4, 5), (3, 6, 7, 8)),
+    4: ((1, 2, 3, 6, 7), (4, 5, 8, 9, 12), (10, 11, 13, 14, 15)),
+}
+
+# Tables can be stored as raw bytes under PATTERN_CACHE_DIR.  The disk cache
+# is off unless PACMAN_PATTERN_CACHE names a directory, so by default the
+# tables are built in memory and ordinary runs never write outside the project.
+PATTERN_CACHE_VERSION = 2
+PATTERN_CACHE_DIR = os.environ.get('PACMAN_PATTERN_CACHE', '')
+_UNSEEN = 255
+
+class PatternDatabase:
+    """
+    A disjoint additive pattern database.  For each group of tiles and each
+    cell of the blank the table holds the fewest moves of those tiles that
+    bring them home, where the other tiles are indistinguishable and only
+    moves of group tiles are counted.  Each real move slides one tile, so the
+    sum over the groups never overestimates.  Keeping the blank in the key
+    also makes the heuristic consistent: a real move changes one group's
+    entry by at most one and leaves the blank's region in the others, so
+    aStarSearch, which never reopens a state, still finds optimal plans.
+    The tables are built once per board size, which takes a minute or two
+    for the 15-puzzle, and read from disk instead when PACMAN_PATTERN_CACHE
+    is set.
+
+    A group's table is indexed by the cells of its tiles in base size*size,
+    then by the blank's cell, so lookups need no ranking; unreachable
+    indexes simply stay unused.
+    """
+    def __init__(self, size, groups=None):
+        self.size = size
+        self.groups = groups or PATTERN_GROUPS[size]
+        n = size * size
+        self.tables = []
+        for tiles in self.groups:
+            powers = [n ** i for i in range(1, len(tiles) + 1)]
+            table = _loadPatternTable(size, tiles)
+            if table is None:
+                table = _buildPatternTable(size, tiles)
+                _savePatternTable(size, tiles, table)
+            self.tables.append((tiles, powers, table))
+
+    def getValue(self, state):
+        "The heuristic value of a state of this database's size."
+        where = [0] * (self.size * self.size)
+        packed = state.packed
+        for cell in range(len(where)):
+            where[packed & 15] = cell
+            packed >>= 4
+        blank = where[0]
+        total = 0
+        for tiles, powers, table in self.tables:
+            index = blank
+            for tile, power in zip(tiles, powers):
+                index += where[tile] * power
+            total += table[index]
+        return total
+
+def _blankRegion(neighbors, blocked, start):
+    "The cells the blank can reach from start without moving a tile in blocked."
+    region = [start]
+    reached = set(region)
+    for cell in region:
+        for neighbor in neighbors[cell]:
+            if neighbor not in reached and neighbor not in blocked:
+                reached.add(neighbor)
+                region.append(neighbor)
+    return reached
+
+def _buildPatternTable(size, tiles):
+    """
+    Breadth-first search backwards from the goal over (placement of the
+    group's tiles, region of the blank).  Moving the blank among the other
+    tiles is free, so the blank is kept as the smallest cell of its region,
+    and each layer is one move of a group tile.  The entry of a placement
+    and blank cell is the layer of the node holding that cell in its region.
+    The table is indexed by placement * size*size + blank cell.
+    """
+    n = size * size
+    k = len(tiles)
+    powers = [n ** i for i in range(1, k + 1)]
+    neighbors = [[newBlank for move, newBlank in moves] for moves in getMoveTable(size)]
+    table = bytearray([_UNSEEN]) * (n ** (k + 1))
+    visited = bytearray(n ** (k + 1))
+    start = sum(tile * power for tile, power in zip(tiles, powers)) # tile t belongs on cell t
+    startBlank = min(_blankRegion(neighbors, set(tiles), 0))
+    visited[start + startBlank] = 1
+    layer = [(start, startBlank)]
+    depth = 0
+    while layer:
+        nextLayer = []
+        for index, blank in layer:
+            cells = []
+            rest = index // n
+            for i in range(k):
+                rest, cell = divmod(rest, n)
+                cells.append(cell)
+            blocked = set(cells)
+            region = _blankRegion(neighbors, blocked, blank)
+            for cell in region:
+                table[index + cell] = depth
+            for i, cell in enumerate(cells):
+                for target in neighbors[cell]:
+                    if target not in region: continue
+                    # Slide tile i into the blank at target; the blank lands on cell
+                    nextIndex = index + (target - cell) * powers[i]
+                    blocked.discard(cell)
+                    blocked.add(target)
+                    nextBlank = min(_blankRegion(neighbors, blocked, cell))
+                    blocked.discard(target)
+                    blocked.add(cell)
+                    if not visited[nextIndex + nextBlank]:
+                        visited[nextIndex + nextBlank] = 1
+                        nextLayer.append((nextIndex, nextBlank))
+        layer = nextLayer
+        depth += 1
+    return table
+
+def _patternPath(size, tiles):
+    name = 'v%d-%dx%d-%s.pdb' % (PATTERN_CACHE_VERSION, size, size, '-'.join(map(str, tiles)))
+    return os.path.join(PATTERN_CACHE_DIR, name)
+
+def _loadPatternTable(size, tiles):
+    "Returns the cached table, or None if it is missing or has the wrong length."
+    if not PATTERN_CACHE_DIR: return None
+    try:
+        with open(_patternPath(size, tiles), 'rb') as f:
+            table = bytearray(f.read())
+    except OSError:
+        return None
+    if len(table) != (size * size) ** (len(tiles) + 1):
+        return None
+    return table
+
+def _savePatternTable(size, tiles, table):
+    "Writes the table under a temporary name and renames it into place.  Errors are ignored."
+    if not PATTERN_CACHE_DIR: return
+    path = _patternPath(size, tiles)
+    tmpPath = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        if not os.path.isdir(PATTERN_CACHE_DIR): os.makedirs(PATTERN_CACHE_DIR)
+        with open(tmpPath, 'wb') as f:
+            f.write(table)
+        os.replace(tmpPath, path)
+    except OSError:
+        try:
+            os.remove(tmpPath)
+        except OSError:
+            pass
+
+_patternDatabases = {}
+
+def getPatternDatabase(size):
+    "Returns the shared PatternDatabase for size x size boards, building it once."
+    if size not in _patternDatabases:
+        _patternDatabases[size] = PatternDatabase(size)
+    return _patternDatabases[size]
+
+def patternDatabaseHeuristic(state, problem=None):
+    """
+    Additive pattern database heuristic for EightPuzzleSearchProblem.
+
+    >>> patternDatabaseHeuristic(EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]))
+    1
+    """
+    return getPatternDatabase(state.size).getValue(state)
+
+def manhattanPuzzleHeuristic(state, problem=None):
+    "Sum of the Manhattan distances of the tiles from their goal cells."
+    size = state.size
+    packed = state.packed
+    total = 0
+    for cell in range(size * size):
+        tile = packed & 15
+        packed >>= 4
+        if tile:
+            total += abs(tile // size - cell // size) + abs(tile % size - cell % size)
+    return total
+
 EIGHT_PUZZLE_DATA = [[1, 0, 2, 3, 4, 5, 6, 7, 8],
                      [1, 7, 8, 2, 3, 4, 5, 6, 0],
                      [4, 3, 2, 7, 0, 5, 1, 6, 8],
@@ -256,20 +480,54 @@ def createRandomEightPuzzle(moves=100):
       a series of 'moves' random moves to a solved
       puzzle.
     """
-    puzzle = EightPuzzleState([0,1,2,3,4,5,6,7,8])
+    return createRandomPuzzle(3, moves)
+
+def createRandomPuzzle(size, moves=100):
+    """
+      Creates a random size x size puzzle, such as the 15-puzzle for size 4,
+      by applying 'moves' random moves to a solved puzzle.
+    """
+    puzzle = EightPuzzleState(list(range(size * size)))
     for i in range(moves):
         # Execute a random legal move
         puzzle = puzzle.result(random.sample(puzzle.legalMoves(), 1)[0])
     return puzzle
 
+def readCommand(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python eightpuzzle.py [options]')
+    parser.add_option('-n', '--size', dest='size', type='int', default=3,
+                      help='side of the board: 3 for the 8-puzzle, 4 for the 15-puzzle [Default: %default]')
+    parser.add_option('-m', '--moves', dest='moves', type='int', default=25,
+                      help='random moves used to scramble the puzzle [Default: %default]')
+    parser.add_option('-f', '--fn', dest='fn', default='breadthFirstSearch',
+                      help='search function in search.py [Default: %default]')
+    parser.add_option('-e', '--heuristic', dest='heuristic', default='patternDatabaseHeuristic',
+                      help='heuristic for informed searches [Default: %default]')
+    parser.add_option('-q', '--quiet', dest='quiet', action='store_true', default=False,
+                      help='print the solution without stepping through it')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
 if __name__ == '__main__':
-    puzzle = createRandomEightPuzzle(25)
+    import sys, time
+    options = readCommand(sys.argv[1:])
+    puzzle = createRandomPuzzle(options.size, options.moves)
     print('A random puzzle:')
     print(puzzle)
 
     problem = EightPuzzleSearchProblem(puzzle)
-    path = search.breadthFirstSearch(problem)
-    print('BFS found a path of %d moves: %s' % (len(path), str(path)))
+    searchFunction = getattr(search, options.fn)
+    start = time.time()
+    if 'heuristic' in searchFunction.__code__.co_varnames:
+        path = searchFunction(problem, heuristic=globals()[options.heuristic])
+    else:
+        path = searchFunction(problem)
+    print('%s found a path of %d moves in %.1f seconds: %s' % (options.fn, len(path), time.time() - start, str(path)))
+    if options.quiet:
+        sys.exit(0)
     curr = puzzle
     i = 1
     for a in path:
@@ -190,6 +190,7 @@ class Grid:
 
     def __eq__(self, other):
         if other == None: return False
+        if isinstance(other, PackedGrid): return other == self
         return self.data == other.data
 
     def __hash__(self):
@@ -274,6 +275,123 @@ class Grid:
                 bools.append(False)
         return bools
 
+class PackedGrid:
+    """
+    An immutable boolean grid packed into a single Python int, with bit
+    x * height + y holding cell (x,y).  It offers the read side of Grid
+    (grid[x][y], count, asList, width, height) so code written for Grid keeps
+    working, while hashing is O(1) and asList is O(number of True cells).
+
+    "Modifying" a PackedGrid returns a new one; see withoutCell.  copy() and
+    deepCopy() return a mutable Grid, like toGrid().
+    """
+    __slots__ = ('width', 'height', 'bits', '_hash')
+
+    def __init__(self, width, height, bits=0):
+        self.width = width
+        self.height = height
+        self.bits = bits
+        self._hash = hash(bits)
+
+    def fromGrid(grid):
+        "Packs the True cells of a Grid (or PackedGrid) into a PackedGrid."
+        if isinstance(grid, PackedGrid): return grid
+        bits = 0
+        index = 0
+        for column in grid.data:
+            for cell in column:
+                if cell: bits |= 1 << index
+                index += 1
+        return PackedGrid(grid.width, grid.height, bits)
+    fromGrid = staticmethod(fromGrid)
+
+    def __getitem__(self, x):
+        if not 0 <= x < self.width:
+            raise IndexError('PackedGrid column %s out of range' % x)
+        return _PackedColumn(self.bits >> (x * self.height), self.height)
+
+    def __str__(self):
+        out = [[str(self[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def __eq__(self, other):
+        # A Grid with the same cells is equal, and Grid.__hash__ agrees
+        if isinstance(other, Grid): other = PackedGrid.fromGrid(other)
+        elif not isinstance(other, PackedGrid): return False
+        return self.bits == other.bits and self.height == other.height and self.width == other.width
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self._hash
+
+    def copy(self):
+        "Returns a mutable Grid, so the Grid idiom of copying and then setting cells works."
+        return self.toGrid()
+
+    def deepCopy(self):
+        return self.toGrid()
+
+    def shallowCopy(self):
+        "Returns self: a PackedGrid cannot change, so sharing it is safe."
+        return self
+
+    def isSet(self, x, y):
+        return (self.bits >> (x * self.height + y)) & 1 == 1
+
+    def withoutCell(self, x, y):
+        "Returns a PackedGrid with (x,y) cleared, or self if it was already False."
+        mask = 1 << (x * self.height + y)
+        if not self.bits & mask: return self
+        return PackedGrid(self.width, self.height, self.bits & ~mask)
+
+    def withCell(self, x, y):
+        "Returns a PackedGrid with (x,y) set, or self if it was already True."
+        mask = 1 << (x * self.height + y)
+        if self.bits & mask: return self
+        return PackedGrid(self.width, self.height, self.bits | mask)
+
+    def count(self, item=True):
+        ones = bin(self.bits).count('1')
+        if item: return ones
+        return self.width * self.height - ones
+
+    def asList(self, key=True):
+        if not key:
+            return [(x, y) for x in range(self.width) for y in range(self.height) if not self.isSet(x, y)]
+        cells = []
+        height = self.height
+        bits = self.bits
+        while bits:
+            low = bits & -bits
+            index = low.bit_length() - 1
+            cells.append((index // height, index % height))
+            bits ^= low
+        return cells
+
+    def toGrid(self):
+        "Returns a mutable Grid with the same contents."
+        g = Grid(self.width, self.height)
+        for x, y in self.asList():
+            g[x][y] = True
+        return g
+
+class _PackedColumn:
+    "Read-only view of one PackedGrid column, so that grid[x][y] works."
+    __slots__ = ('bits', 'height')
+
+    def __init__(self, bits, height):
+        self.bits = bits
+        self.height = height
+
+    def __getitem__(self, y):
+        # Unchecked, y past the top would read the next column's bits
+        if not 0 <= y < self.height:
+            raise IndexError('PackedGrid row %s out of range' % y)
+        return (self.bits >> y) & 1 == 1
+
 def reconstituteGrid(bitRep):
     if type(bitRep) is not type((1,2)):
         return bitRep
@@ -14,11 +14,18 @@
 
 from util import manhattanDistance
 from game import Grid
+from game import Directions
+import collections
+import heapq
 import os
 import random
 from functools import reduce
 
 VISIBILITY_MATRIX_CACHE = {}
+# The JUNCTION_GRAPH_CACHE_SIZE most recently used wall layouts keep their
+# JunctionGraph, so a long batch or benchmark run does not keep every graph.
+JUNCTION_GRAPH_CACHE_SIZE = 8
+JUNCTION_GRAPH_CACHE = collections.OrderedDict() # wall layout -> JunctionGraph, least recent first
 
 class Layout:
     """
@@ -87,6 +94,9 @@ class Layout:
         row, col = [int(x) for x in pacPos]
         return ghostPos in self.visibility[row][col][pacDirection]
 
+    def getJunctionGraph(self):
+        return getJunctionGraph(self.walls)
+
     def __str__(self):
         return "\n".join(self.layoutText)
 
@@ -129,6 +139,153 @@ class Layout:
         elif layoutChar in  ['1', '2', '3', '4']:
             self.agentPositions.append( (int(layoutChar), (x,y)))
             self.numGhosts += 1
+
+
+class JunctionGraph:
+    """
+    The maze of a walls Grid compressed to its decision points.  Junctions
+    are the open cells without exactly two open neighbors (dead ends, forks
+    and the cells of open areas); everything else lies on a corridor, a run
+    of cells joining two junctions.  Each corridor is stored once as
+    (start, end, actions, cells), where actions lead from start to end and
+    cells are the corridor cells in between, cells[i] being reached by
+    actions[i].  A loop with no junction on it gets one of its cells as a
+    junction.
+
+    Distances between junctions are found with Dijkstra over the corridors,
+    so their cost grows with the number of junctions rather than of cells.
+    """
+    _moves = [(Directions.NORTH, (0, 1)), (Directions.SOUTH, (0, -1)),
+              (Directions.EAST, (1, 0)), (Directions.WEST, (-1, 0))]
+
+    def __init__(self, walls):
+        self.walls = walls
+        self.junctions = []
+        self.corridors = []
+        self.edges = {}       # junction -> [(other end, actions, cells)]
+        self.corridorOf = {}  # corridor cell -> (corridor index, steps from its start)
+        self._distances = {}  # junction -> {junction: distance}
+
+        openCells = walls.asList(False)
+        self._junctionSet = set()
+        for cell in openCells:
+            if len(self._openMoves(cell)) != 2:
+                self._addJunction(cell)
+        traced = set()
+        for junction in self.junctions:
+            for direction, _ in self._openMoves(junction):
+                if (junction, direction) not in traced:
+                    self._traceCorridor(junction, direction, traced)
+        for cell in openCells:
+            if cell not in self._junctionSet and cell not in self.corridorOf:
+                self._addJunction(cell)
+                self._traceCorridor(cell, self._openMoves(cell)[0][0], traced)
+
+    def _openMoves(self, cell):
+        x, y = cell
+        moves = []
+        for direction, (dx, dy) in self._moves:
+            nextx, nexty = x + dx, y + dy
+            if 0 <= nextx < self.walls.width and 0 <= nexty < self.walls.height and not self.walls[nextx][nexty]:
+                moves.append((direction, (nextx, nexty)))
+        return moves
+
+    def _addJunction(self, cell):
+        self.junctions.append(cell)
+        self._junctionSet.add(cell)
+        self.edges[cell] = []
+
+    def _traceCorridor(self, start, direction, traced):
+        "Follows the corridor leaving start toward direction up to the next junction."
+        actions, cells = [direction], []
+        cell = dict(self._openMoves(start))[direction]
+        while cell not in self._junctionSet:
+            cells.append(cell)
+            back = Directions.REVERSE[actions[-1]]
+            direction, cell = [move for move in self._openMoves(cell) if move[0] != back][0]
+            actions.append(direction)
+        end = cell
+        traced.add((start, actions[0]))
+        traced.add((end, Directions.REVERSE[actions[-1]]))
+
+        index = len(self.corridors)
+        actions, cells = tuple(actions), tuple(cells)
+        self.corridors.append((start, end, actions, cells))
+        for offset, cell in enumerate(cells):
+            self.corridorOf[cell] = (index, offset + 1)
+        self.edges[start].append((end, actions, cells))
+        self.edges[end].append((start, self._reverseActions(actions), cells[::-1]))
+
+    def _reverseActions(self, actions):
+        return tuple([Directions.REVERSE[action] for action in reversed(actions)])
+
+    def isJunction(self, position):
+        return position in self._junctionSet
+
+    def getExits(self, position):
+        """
+        Returns (junction, actions, cells) for each way out of an open cell
+        toward the next junction, cells being those passed before arriving.
+        From a junction these are its corridors; from a corridor cell they
+        are the two remaining parts of its corridor.
+        """
+        if position in self._junctionSet:
+            return self.edges[position]
+        index, offset = self.corridorOf[position]
+        start, end, actions, cells = self.corridors[index]
+        return [(end, actions[offset:], cells[offset:]),
+                (start, self._reverseActions(actions[:offset]), cells[:offset - 1][::-1])]
+
+    def getDistancesFrom(self, junction):
+        "The maze distance from junction to every junction it can reach."
+        if junction not in self._distances:
+            distances = {junction: 0}
+            heap = [(0, junction)]
+            while heap:
+                distance, current = heapq.heappop(heap)
+                if distance > distances[current]: continue
+                for end, actions, _ in self.edges[current]:
+                    total = distance + len(actions)
+                    if end not in distances or total < distances[end]:
+                        distances[end] = total
+                        heapq.heappush(heap, (total, end))
+            self._distances[junction] = distances
+        return self._distances[junction]
+
+    def getDistance(self, pos1, pos2):
+        "The maze distance between two open cells, or None if they are not connected."
+        if pos1 == pos2: return 0
+        best = None
+        if pos1 in self.corridorOf and pos2 in self.corridorOf:
+            index1, offset1 = self.corridorOf[pos1]
+            index2, offset2 = self.corridorOf[pos2]
+            if index1 == index2:
+                best = abs(offset1 - offset2)
+        exits2 = [(end, len(actions)) for end, actions, _ in self.getExits(pos2)] \
+            if pos2 not in self._junctionSet else [(pos2, 0)]
+        exits1 = [(end, len(actions)) for end, actions, _ in self.getExits(pos1)] \
+            if pos1 not in self._junctionSet else [(pos1, 0)]
+        for junction1, distance1 in exits1:
+            distances = self.getDistancesFrom(junction1)
+            for junction2, distance2 in exits2:
+                if junction2 in distances:
+                    total = distance1 + distances[junction2] + distance2
+                    if best is None or total < best:
+                        best = total
+        return best
+
+def getJunctionGraph(walls):
+    "Returns the JunctionGraph of a walls Grid, built once per wall layout."
+    key = (walls.width, walls.height, tuple(tuple(column) for column in walls.data))
+    graph = JUNCTION_GRAPH_CACHE.get(key)
+    if graph is not None:
+        JUNCTION_GRAPH_CACHE.move_to_end(key)
+        return graph
+    graph = JUNCTION_GRAPH_CACHE[key] = JunctionGraph(walls)
+    if len(JUNCTION_GRAPH_CACHE) > JUNCTION_GRAPH_CACHE_SIZE:
+        JUNCTION_GRAPH_CACHE.popitem(last=False)
+    return graph
+
 def getLayout(name, back = 2):
     if name.endswith('.lay'):
         layout = tryToLoad('layouts/' + name)
@@ -0,0 +1,141 @@
+# planCache.py
+# ------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+A cache of the plans SearchAgent finds, so running the same search again,
+as pacman.py -n 100 or the autograder do, looks the plan up instead of
+solving it again.
+
+Plans are keyed on a digest of everything the search depends on: the walls,
+the food, Pacman's start, the agent class, the problem type, the search
+function and the heuristic, and the source of the code that runs them, so
+editing search.py, searchAgents.py or the modules they use retires every
+plan found before.  The most recent plans are kept in memory; with a disk
+store they are also written as small JSON files so later processes can
+reuse them.  Set PACMAN_PLAN_CACHE to choose the directory.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import sys
+
+PLAN_CACHE_SIZE = 128 # Plans kept in memory
+PLAN_CACHE_VERSION = 1
+PLAN_CACHE_DIR = os.environ.get('PACMAN_PLAN_CACHE',
+                                os.path.join(os.path.expanduser('~'), '.cache', 'pacman', 'plans'))
+
+_sourceDigests = {} # (path, modification time, size) -> digest of the file
+
+def sourceDigest(moduleNames):
+    "A hex digest of the source files of the named (imported) modules."
+    digest = hashlib.sha256()
+    for name in moduleNames:
+        path = getattr(sys.modules.get(name), '__file__', None)
+        try:
+            info = os.stat(path)
+            fileKey = (path, info.st_mtime_ns, info.st_size)
+            if fileKey not in _sourceDigests:
+                with open(path, 'rb') as f:
+                    _sourceDigests[fileKey] = hashlib.sha256(f.read()).hexdigest()
+            digest.update(_sourceDigests[fileKey].encode('utf-8'))
+        except (OSError, TypeError):
+            digest.update(name.encode('utf-8'))
+    return digest.hexdigest()
+
+def planKey(gameState, agentName, problemName, functionName, heuristicName, codeDigest=''):
+    """
+    A hex digest identifying a search on the layout and food of gameState.
+    codeDigest (see sourceDigest) identifies the code that does the search.
+    """
+    walls = gameState.getWalls()
+    parts = ['v%d' % PLAN_CACHE_VERSION, agentName, problemName, functionName, heuristicName, codeDigest,
+             str(gameState.getPacmanPosition()),
+             '%dx%d' % (walls.width, walls.height),
+             ''.join(['1' if wall else '0' for column in walls.data for wall in column]),
+             ''.join(['1' if food else '0' for column in gameState.getFood().data for food in column])]
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+class PlanCache:
+    """
+    An LRU cache from planKey digests to lists of actions, optionally backed
+    by one JSON file per plan in directory.  Disk errors are never fatal:
+    unreadable entries count as misses and failed writes are skipped.
+    """
+    def __init__(self, maxSize=PLAN_CACHE_SIZE):
+        self.maxSize = maxSize
+        self.plans = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, useDisk=False):
+        "Returns the cached plan for key, or None."
+        plan = self.plans.get(key)
+        if plan is None and useDisk:
+            plan = self._read(key)
+            if plan is not None:
+                self._remember(key, plan)
+        if plan is None:
+            self.misses += 1
+            return None
+        self.plans.move_to_end(key)
+        self.hits += 1
+        return list(plan)
+
+    def put(self, key, plan, useDisk=False):
+        self._remember(key, tuple(plan))
+        if useDisk:
+            self._write(key, plan)
+
+    def _remember(self, key, plan):
+        self.plans[key] = plan
+        self.plans.move_to_end(key)
+        if len(self.plans) > self.maxSize:
+            self.plans.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(PLAN_CACHE_DIR, key + '.json')
+
+    def _read(self, key):
+        if not PLAN_CACHE_DIR: return None
+        try:
+            with open(self._path(key)) as f:
+                plan = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(plan, list) or not all(isinstance(action, str) for action in plan):
+            return None
+        return tuple(plan)
+
+    def _write(self, key, plan):
+        if not PLAN_CACHE_DIR: return
+        path = self._path(key)
+        tmpPath = '%s.%d.tmp' % (path, os.getpid())
+        try:
+            if not os.path.isdir(PLAN_CACHE_DIR): os.makedirs(PLAN_CACHE_DIR)
+            with open(tmpPath, 'w') as f:
+                json.dump(list(plan), f)
+            os.replace(tmpPath, path)
+        except OSError:
+            try:
+                os.remove(tmpPath)
+            except OSError:
+                pass
+
+_planCache = PlanCache()
+
+def getPlanCache():
+    "The PlanCache shared by every SearchAgent in this process."
+    return _planCache
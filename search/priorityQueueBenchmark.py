@@ -0,0 +1,105 @@
+# priorityQueueBenchmark.py
+# -------------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Micro-benchmark for util.PriorityQueue.update.  A frontier of the given size
+is filled, then a batch of decrease-key updates is timed against both the
+indexed queue in util.py and the previous linear-scan implementation.
+
+> python priorityQueueBenchmark.py
+> python priorityQueueBenchmark.py -s 1000,100000 -u 50
+"""
+
+import heapq
+import random
+import sys
+import time
+import util
+
+class LinearScanPriorityQueue:
+    """
+    The original util.PriorityQueue, whose update scans the whole heap.  Kept
+    as the baseline timed here and as the reference that PriorityQueueTest in
+    searchTestClasses.py checks the indexed queue against.
+    """
+    def __init__(self):
+        self.heap = []
+        self.count = 0
+
+    def push(self, item, priority):
+        entry = (priority, self.count, item)
+        heapq.heappush(self.heap, entry)
+        self.count += 1
+
+    def pop(self):
+        (_, _, item) = heapq.heappop(self.heap)
+        return item
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def update(self, item, priority):
+        for index, (p, c, i) in enumerate(self.heap):
+            if i == item:
+                if p <= priority:
+                    break
+                del self.heap[index]
+                self.heap.append((priority, c, item))
+                heapq.heapify(self.heap)
+                break
+        else:
+            self.push(item, priority)
+
+def timeUpdates(queueClass, size, numUpdates, seed=0):
+    """
+    Returns the mean seconds per update after pushing `size` items and then
+    decreasing the priority of `numUpdates` random ones.
+    """
+    rand = random.Random(seed)
+    queue = queueClass()
+    for item in range(size):
+        queue.push(item, rand.random() + 1)
+    targets = [rand.randrange(size) for _ in range(numUpdates)]
+    start = time.perf_counter()
+    for k, item in enumerate(targets):
+        queue.update(item, -k)
+    return (time.perf_counter() - start) / numUpdates
+
+def runBenchmark(sizes, numUpdates, maxLinearSize):
+    print('%10s %16s %16s %10s' % ('frontier', 'linear us/upd', 'indexed us/upd', 'speedup'))
+    for size in sizes:
+        indexed = timeUpdates(util.PriorityQueue, size, numUpdates)
+        if size <= maxLinearSize:
+            linear = timeUpdates(LinearScanPriorityQueue, size, numUpdates)
+            print('%10d %16.2f %16.2f %9.0fx' % (size, linear * 1e6, indexed * 1e6, linear / indexed))
+        else:
+            print('%10d %16s %16.2f %10s' % (size, 'skipped', indexed * 1e6, '-'))
+
+def readCommand(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python priorityQueueBenchmark.py [options]')
+    parser.add_option('-s', '--sizes', dest='sizes', default='1000,10000,100000,1000000',
+                      help='comma separated frontier sizes [Default: %default]')
+    parser.add_option('-u', '--updates', dest='updates', type='int', default=100,
+                      help='decrease-key operations timed per size [Default: %default]')
+    parser.add_option('--max-linear', dest='maxLinear', type='int', default=1000000,
+                      help='largest frontier to time with the linear scan [Default: %default]')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    sizes = [int(s) for s in options.sizes.split(',')]
+    return sizes, options.updates, options.maxLinear
+
+if __name__ == '__main__':
+    runBenchmark(*readCommand(sys.argv[1:]))
@@ -17,8 +17,18 @@ In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import collections
+import functools
+import heapq
+import time
 import util
 
+try:
+    import numpy
+    _NUMPY_ENABLED = True
+except ImportError:
+    _NUMPY_ENABLED = False
+
 class SearchProblem:
     """
     This class outlines the structure of a search problem, but doesn't implement
@@ -61,6 +71,23 @@ class SearchProblem:
         """
         util.raiseNotDefined()
 
+    def getGoalState(self):
+        """
+        Optional.  Returns the single goal state of the problem; only needed by
+        the bidirectional searches, which grow a second search backward from it.
+        """
+        util.raiseNotDefined()
+
+    def getPredecessors(self, state):
+        """
+          state: Search state
+
+        Optional.  Only needed by the bidirectional searches.  Returns a list
+        of triples, (predecessor, action, stepCost), where taking 'action' in
+        'predecessor' leads to 'state' at a cost of 'stepCost'.
+        """
+        util.raiseNotDefined()
+
 
 def tinyMazeSearch(problem):
     """
@@ -73,11 +100,29 @@ def tinyMazeSearch(problem):
     return  [s, s, w, s, w, w, s, w]
 
 class Node:
-    def __init__(self, state, path = [], cost = 0):
+    """
+    A search node.  Rather than copying the full action list into every child,
+    each node only remembers its parent and the action that led to it; the
+    plan is rebuilt once, by getPath, when a goal node is popped.
+    """
+    __slots__ = ('state', 'parent', 'action', 'cost')
+
+    def __init__(self, state, parent = None, action = None, cost = 0):
         self.state = state
-        self.path = path
+        self.parent = parent
+        self.action = action
         self.cost = cost
 
+    def getPath(self):
+        "Returns the list of actions leading from the root to this node."
+        path = []
+        node = self
+        while node.parent is not None:
+            path.append(node.action)
+            node = node.parent
+        path.reverse()
+        return path
+
 
 def depthFirstSearch(problem):
     """
@@ -96,21 +141,21 @@ def depthFirstSearch(problem):
     "*** YOUR CODE HERE ***"
     visitedNodes = set()
     currentNode = Node(problem.getStartState())
-    stack = util.Stack()
+    stack = _newFrontier(problem, util.Stack)
     stack.push(currentNode)
 
     while not stack.isEmpty():
         currentNode = stack.pop()
 
         if problem.isGoalState(currentNode.state):
-            return currentNode.path
+            return currentNode.getPath()
 
         if currentNode.state in visitedNodes:
             continue
         
         visitedNodes.add(currentNode.state)
         for child in problem.getSuccessors(currentNode.state):
-            node = Node(child[0], currentNode.path + [child[1]])
+            node = Node(child[0], currentNode, child[1])
             stack.push(node)
     return []
 
@@ -119,21 +164,21 @@ def breadthFirstSearch(problem):
     "*** YOUR CODE HERE ***"
     visitedNodes = set()
     currentNode = Node(problem.getStartState())
-    queue = util.Queue()
+    queue = _newFrontier(problem, util.Queue)
     queue.push(currentNode)
 
     while not queue.isEmpty():
         currentNode = queue.pop()
 
         if problem.isGoalState(currentNode.state):
-            return currentNode.path
+            return currentNode.getPath()
 
         if currentNode.state in visitedNodes:
             continue
         
         visitedNodes.add(currentNode.state)
         for child in problem.getSuccessors(currentNode.state):
-            node = Node(child[0], currentNode.path + [child[1]])
+            node = Node(child[0], currentNode, child[1])
             queue.push(node)
     return []
 
@@ -142,21 +187,21 @@ def uniformCostSearch(problem):
     "*** YOUR CODE HERE ***"
     visitedNodes = set()
     currentNode = Node(problem.getStartState())
-    pQueue = util.PriorityQueue()
+    pQueue = _newFrontier(problem, util.PriorityQueue)
     pQueue.push(currentNode, 0)
 
     while not pQueue.isEmpty():
         currentNode = pQueue.pop()
 
         if problem.isGoalState(currentNode.state):
-            return currentNode.path
+            return currentNode.getPath()
 
         if currentNode.state in visitedNodes:
             continue
         
         visitedNodes.add(currentNode.state)
         for child in problem.getSuccessors(currentNode.state):
-            node = Node(child[0], currentNode.path + [child[1]], currentNode.cost + child[2])
+            node = Node(child[0], currentNode, child[1], currentNode.cost + child[2])
             pQueue.update(node, node.cost)
     return []
 
@@ -167,32 +212,1011 @@ def nullHeuristic(state, problem=None):
     """
     return 0
 
+HEURISTIC_CACHE_SIZE = 100000 # Default number of states memoizeHeuristic keeps per problem
+
+class HeuristicCache:
+    """
+    A bounded LRU cache of one heuristic's values on one problem, with hit
+    and miss counters and the time spent computing the misses.
+    """
+    def __init__(self, maxSize):
+        self.maxSize = maxSize
+        self.values = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.missTime = 0.0
+
+    def getStats(self):
+        """
+        Returns a dict of hits, misses, hitRate, size and timeSaved, where
+        timeSaved estimates the seconds the hits would have taken to compute.
+        """
+        calls = self.hits + self.misses
+        meanMissTime = self.missTime / self.misses if self.misses else 0.0
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': float(self.hits) / calls if calls else 0.0,
+                'size': len(self.values),
+                'timeSaved': self.hits * meanMissTime}
+
+class MemoizedHeuristic:
+    """
+    Wraps heuristic(state, problem) so that each problem instance keeps its
+    own HeuristicCache, stored in problem._heuristicCaches.  The caches live
+    and die with their problems, so one wrapper can serve many searches.
+    The heuristic must depend only on the state and the problem.
+    """
+    def __init__(self, heuristic, maxSize=HEURISTIC_CACHE_SIZE):
+        functools.update_wrapper(self, heuristic)
+        self.heuristic = heuristic
+        self.maxSize = maxSize
+
+    def getCache(self, problem):
+        "Returns this heuristic's cache for problem, creating it if needed."
+        caches = problem.__dict__.setdefault('_heuristicCaches', {})
+        cache = caches.get(self)
+        if cache is None:
+            cache = caches[self] = HeuristicCache(self.maxSize)
+        return cache
+
+    def __call__(self, state, problem=None):
+        if problem is None:
+            return self.heuristic(state, problem)
+        cache = self.getCache(problem)
+        values = cache.values
+        try:
+            value = values[state]
+        except KeyError:
+            pass
+        except TypeError: # Unhashable state; nothing to memoize
+            return self.heuristic(state, problem)
+        else:
+            values.move_to_end(state)
+            cache.hits += 1
+            return value
+        start = time.perf_counter()
+        value = self.heuristic(state, problem)
+        cache.missTime += time.perf_counter() - start
+        cache.misses += 1
+        values[state] = value
+        if len(values) > cache.maxSize:
+            values.popitem(last=False)
+        return value
+
+def memoizeHeuristic(heuristic, maxSize=HEURISTIC_CACHE_SIZE):
+    """
+    Returns heuristic memoized per problem in an LRU cache of maxSize states.
+    Can be used as a decorator:
+
+    @search.memoizeHeuristic
+    def myHeuristic(state, problem): ...
+    """
+    return MemoizedHeuristic(heuristic, maxSize)
+
 def aStarSearch(problem, heuristic=nullHeuristic):
     """Search the node that has the lowest combined cost and heuristic first."""
     "*** YOUR CODE HERE ***"
+    heuristic = _instrumentHeuristic(problem, heuristic)
     visitedNodes = set()
     currentNode = Node(problem.getStartState())
-    pQueue = util.PriorityQueue()
+    pQueue = _newFrontier(problem, util.PriorityQueue)
     pQueue.push(currentNode, 0)
 
     while not pQueue.isEmpty():
         currentNode = pQueue.pop()
 
         if problem.isGoalState(currentNode.state):
-            return currentNode.path
+            return currentNode.getPath()
 
         if currentNode.state in visitedNodes:
             continue
         
         visitedNodes.add(currentNode.state)
         for child in problem.getSuccessors(currentNode.state):
-            node = Node(child[0], currentNode.path + [child[1]], currentNode.cost + child[2])
+            node = Node(child[0], currentNode, child[1], currentNode.cost + child[2])
             pQueue.update(node, node.cost + heuristic(child[0], problem))
     return []
 
+def _reportGoal(problem, goal):
+    """
+    The bidirectional searches never ask isGoalState about the goal they
+    start from, so this does, once a path is found, only for the side effect:
+    PositionSearchProblem.isGoalState is what draws the goal on the display.
+    """
+    problem.isGoalState(goal)
+
+def _joinPaths(forwardParents, backwardParents, meeting):
+    """
+    Builds the plan through a meeting edge (u, action, v) found by a
+    bidirectional search; action is None when both searches reached u == v.
+    forwardParents maps a state to (parent, action) toward the start and
+    backwardParents maps a state to (child, action) toward the goal.
+    """
+    u, action, v = meeting
+    path = []
+    state = u
+    while forwardParents[state] is not None:
+        state, stepAction = forwardParents[state]
+        path.append(stepAction)
+    path.reverse()
+    if action is not None:
+        path.append(action)
+    state = v
+    while backwardParents[state] is not None:
+        state, stepAction = backwardParents[state]
+        path.append(stepAction)
+    return path
+
+def bidirectionalBreadthFirstSearch(problem):
+    """
+    Search forward from the start and backward from problem.getGoalState(),
+    one full layer at a time from whichever frontier is smaller, and stop at
+    the first layer where the two meet.  Returns a path with the fewest
+    actions, like breadthFirstSearch.  The problem must implement
+    getGoalState and getPredecessors.
+    """
+    start, goal = problem.getStartState(), problem.getGoalState()
+    if start == goal:
+        _reportGoal(problem, goal)
+        return []
+    forwardParents, backwardParents = {start: None}, {goal: None}
+    forwardDepth, backwardDepth = {start: 0}, {goal: 0}
+    forwardLayer, backwardLayer = [start], [goal]
+
+    while forwardLayer and backwardLayer:
+        forward = len(forwardLayer) <= len(backwardLayer)
+        if forward:
+            layer, parents, depth = forwardLayer, forwardParents, forwardDepth
+            otherDepth, expand = backwardDepth, problem.getSuccessors
+        else:
+            layer, parents, depth = backwardLayer, backwardParents, backwardDepth
+            otherDepth, expand = forwardDepth, problem.getPredecessors
+
+        best, meeting = None, None
+        nextLayer = []
+        for state in layer:
+            for child, action, _ in expand(state):
+                if child in otherDepth:
+                    length = depth[state] + 1 + otherDepth[child]
+                    if best is None or length < best:
+                        best = length
+                        meeting = (state, action, child) if forward else (child, action, state)
+                if child not in parents:
+                    parents[child] = (state, action)
+                    depth[child] = depth[state] + 1
+                    nextLayer.append(child)
+        if meeting is not None:
+            _reportGoal(problem, goal)
+            return _joinPaths(forwardParents, backwardParents, meeting)
+        if forward:
+            forwardLayer = nextLayer
+        else:
+            backwardLayer = nextLayer
+    return []
+
+class _ReversedProblem:
+    """
+    A view of a problem whose start and goal are swapped, so an ordinary
+    heuristic(state, problem) that reads problem.goal estimates the distance
+    back to the start.  Everything else is delegated to the wrapped problem.
+    """
+    def __init__(self, problem):
+        self._problem = problem
+        self.goal = problem.getStartState()
+
+    def getStartState(self):
+        return self._problem.getGoalState()
+
+    def getGoalState(self):
+        return self.goal
+
+    def isGoalState(self, state):
+        return state == self.goal
+
+    def __getattr__(self, name):
+        return getattr(self._problem, name)
+
+def bidirectionalAStarSearch(problem, heuristic=nullHeuristic):
+    """
+    Bidirectional A* with the average of the forward and backward heuristics
+    as a shared potential, which keeps both searches consistent.  The forward
+    search is keyed on g + (hf - hb) / 2 and the backward one on
+    g - (hf - hb) / 2, and the search stops once the sum of the last keys
+    popped on both sides reaches the cost of the best meeting found.  The
+    backward heuristic is heuristic(state, reversed problem), where the
+    reversed problem's goal is the start.  The heuristic must be consistent
+    and the problem must implement getGoalState and getPredecessors.
+    """
+    heuristic = _instrumentHeuristic(problem, heuristic)
+    start, goal = problem.getStartState(), problem.getGoalState()
+    reversedProblem = _ReversedProblem(problem)
+    potentials = {}
+    def potential(state):
+        if state not in potentials:
+            potentials[state] = (heuristic(state, problem) - heuristic(state, reversedProblem)) / 2.0
+        return potentials[state]
+
+    forwardParents, backwardParents = {start: None}, {goal: None}
+    forwardCosts, backwardCosts = {start: 0}, {goal: 0}
+    forwardQueue = _newFrontier(problem, util.PriorityQueue)
+    backwardQueue = _newFrontier(problem, util.PriorityQueue)
+    forwardQueue.push(start, potential(start))
+    backwardQueue.push(goal, -potential(goal))
+    forwardClosed, backwardClosed = set(), set()
+    lastForwardKey, lastBackwardKey = potential(start), -potential(goal)
+    best, meeting = None, None
+    if start == goal:
+        best, meeting = 0, (start, None, goal)
+
+    forward = True
+    while not forwardQueue.isEmpty() and not backwardQueue.isEmpty():
+        if best is not None and lastForwardKey + lastBackwardKey >= best:
+            break
+        if forward:
+            queue, closed, costs, parents = forwardQueue, forwardClosed, forwardCosts, forwardParents
+            otherCosts, expand, sign = backwardCosts, problem.getSuccessors, 1
+        else:
+            queue, closed, costs, parents = backwardQueue, backwardClosed, backwardCosts, backwardParents
+            otherCosts, expand, sign = forwardCosts, problem.getPredecessors, -1
+
+        state = queue.pop()
+        if state in closed:
+            continue
+        closed.add(state)
+        key = costs[state] + sign * potential(state)
+        if forward:
+            lastForwardKey = key
+        else:
+            lastBackwardKey = key
+
+        for child, action, stepCost in expand(state):
+            cost = costs[state] + stepCost
+            if child not in costs or cost < costs[child]:
+                costs[child] = cost
+                parents[child] = (state, action)
+                queue.update(child, cost + sign * potential(child))
+            if child in otherCosts:
+                total = cost + otherCosts[child]
+                if best is None or total < best:
+                    best = total
+                    meeting = (state, action, child) if forward else (child, action, state)
+        forward = not forward
+
+    if meeting is None:
+        return []
+    _reportGoal(problem, goal)
+    return _joinPaths(forwardParents, backwardParents, meeting)
+
+def iterativeDeepeningAStarSearch(problem, heuristic=nullHeuristic):
+    """
+    IDA*: repeated depth-first searches that prune nodes whose f = g + h
+    exceeds a bound, raising the bound to the smallest pruned f after each
+    pass.  Only the current path is kept in memory, so peak memory grows with
+    the solution depth rather than with the number of states seen.  States
+    already on the current path are skipped to avoid cycles.
+    """
+    heuristic = _instrumentHeuristic(problem, heuristic)
+    start = problem.getStartState()
+    if problem.isGoalState(start):
+        return []
+    bound = heuristic(start, problem)
+    while True:
+        path, nextBound = _costBoundedSearch(problem, heuristic, start, bound)
+        if path is not None:
+            return path
+        if nextBound is None:
+            return []
+        bound = nextBound
+
+def _costBoundedSearch(problem, heuristic, start, bound):
+    """
+    One IDA* pass.  Returns (path, None) if a goal is reached within the
+    bound, otherwise (None, smallest f that exceeded the bound), where that f
+    is None if nothing was pruned.
+    """
+    nextBound = None
+    actions = []
+    onPath = set([start])
+    stack = [(start, 0, iter(problem.getSuccessors(start)))]
+    while stack:
+        state, cost, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            onPath.discard(state)
+            if actions: actions.pop()
+            continue
+        successor, action, stepCost = child
+        if successor in onPath:
+            continue
+        successorCost = cost + stepCost
+        f = successorCost + heuristic(successor, problem)
+        if f > bound:
+            if nextBound is None or f < nextBound:
+                nextBound = f
+            continue
+        if problem.isGoalState(successor):
+            return actions + [action], None
+        actions.append(action)
+        onPath.add(successor)
+        stack.append((successor, successorCost, iter(problem.getSuccessors(successor))))
+    return None, nextBound
+
+def _checkGridProblem(problem, searchName):
+    """
+    Raises TypeError unless problem's states are (x, y) positions in
+    problem.walls and problem.hasUnitCosts() says every step costs 1.
+    """
+    walls = getattr(problem, 'walls', None)
+    start = problem.getStartState()
+    isPosition = isinstance(start, tuple) and len(start) == 2 and \
+        all(isinstance(coordinate, int) for coordinate in start)
+    if walls is None or not hasattr(walls, 'width') or not isPosition:
+        raise TypeError('%s needs a problem whose states are (x, y) positions and that has '
+                        'a walls Grid, such as PositionSearchProblem or AnyFoodSearchProblem; '
+                        'got %s' % (searchName, type(problem).__name__))
+    hasUnitCosts = getattr(problem, 'hasUnitCosts', None)
+    if hasUnitCosts is None or not hasUnitCosts():
+        raise TypeError('%s needs every step to cost 1, but this %s has another costFn'
+                        % (searchName, type(problem).__name__))
+
+def frontierBreadthFirstSearch(problem):
+    """
+    Breadth-first search for grid problems whose states are positions and
+    whose steps all cost 1, such as PositionSearchProblem.  Instead of
+    calling getSuccessors for each state, it expands a whole BFS layer at
+    once from the NeighborTable of problem.walls (see distanceOracle.py):
+    with NumPy the next layer is gathered from the neighbor array, and
+    without it from the table's neighbor ids.  Returns a shortest plan, like
+    breadthFirstSearch; the goal test is applied to each state as the layer
+    that contains it is reached.
+    """
+    import distanceOracle
+    _checkGridProblem(problem, 'frontierBreadthFirstSearch')
+    table = distanceOracle.getNeighborTable(problem.walls)
+    start = problem.getStartState()
+    if problem.isGoalState(start):
+        return []
+    if start not in table.cellIds:
+        return []
+    n = len(table.cells)
+    if _NUMPY_ENABLED:
+        parents, moves = numpy.full(n, -1, dtype=numpy.intp), numpy.zeros(n, dtype=numpy.int8)
+        nextLayer = _nextLayerNumpy
+    else:
+        parents, moves = [-1] * n, [0] * n
+        nextLayer = _nextLayerPython
+    startId = table.cellIds[start]
+    parents[startId] = startId
+    layer = [startId]
+
+    goal = None
+    while layer and goal is None:
+        _recordExpansions(problem, [table.cells[i] for i in layer])
+        layer = nextLayer(table, layer, parents, moves)
+        for i in layer:
+            if problem.isGoalState(table.cells[i]):
+                goal = i
+                break
+    if goal is None:
+        return []
+    path = []
+    while goal != startId:
+        path.append(table.directions[int(moves[goal])])
+        goal = int(parents[goal])
+    path.reverse()
+    return path
+
+def _nextLayerPython(table, layer, parents, moves):
+    "Claims the unseen neighbors of layer, in the order a FIFO queue would reach them."
+    nextLayer = []
+    neighborIds = table.neighborIds
+    for cell in layer:
+        for move, neighbor in enumerate(neighborIds[cell]):
+            if neighbor >= 0 and parents[neighbor] < 0:
+                parents[neighbor] = cell
+                moves[neighbor] = move
+                nextLayer.append(neighbor)
+    return nextLayer
+
+def _nextLayerNumpy(table, layer, parents, moves):
+    "_nextLayerPython on arrays: parents and moves are NumPy arrays here."
+    cells = numpy.asarray(layer, dtype=numpy.intp)
+    neighbors = table.neighborArray[cells].ravel()
+    sources = numpy.repeat(cells, 4)
+    directions = numpy.tile(numpy.arange(4, dtype=numpy.int8), len(cells))
+    keep = neighbors >= 0
+    neighbors, sources, directions = neighbors[keep], sources[keep], directions[keep]
+    keep = parents[neighbors] < 0
+    neighbors, sources, directions = neighbors[keep], sources[keep], directions[keep]
+    # The first claim on each cell wins, as it would in a FIFO queue
+    _, first = numpy.unique(neighbors, return_index=True)
+    first.sort()
+    neighbors = neighbors[first]
+    parents[neighbors] = sources[first]
+    moves[neighbors] = directions[first]
+    return neighbors.tolist()
+
+def _recordExpansions(problem, states):
+    "Keeps the display bookkeeping of the grid problems for searches that skip getSuccessors."
+    if isinstance(problem, InstrumentedProblem):
+        problem.stats.expanded += len(states)
+        problem = problem.problem
+    if '_expanded' in dir(problem):
+        problem._expanded += len(states)
+        for state in states:
+            if state not in problem._visited:
+                problem._visited[state] = True
+                problem._visitedlist.append(state)
+
+def jumpPointSearch(problem, heuristic=nullHeuristic):
+    """
+    Jump Point Search for uniform-cost problems on Pacman's 4-connected grid,
+    such as PositionSearchProblem and AnyFoodSearchProblem.  States must be
+    (x, y) positions, every step must cost 1 and problem.walls must be the
+    layout's walls Grid.
+
+    Among equally short paths only those that make their vertical moves
+    before their horizontal ones are searched.  A horizontal scan runs until
+    it reaches a goal or a cell whose vertical neighbour opens up where the
+    previous cell's was blocked; a vertical scan also stops at any cell from
+    which a horizontal scan finds such a cell.  Only the cells where scans
+    stop are expanded, so a corridor costs one expansion however long it is.
+    The jumps are unrolled into single steps, so the plan is a standard list
+    of actions with the same cost A* would find.
+    """
+    from game import Directions
+    _checkGridProblem(problem, 'jumpPointSearch')
+    heuristic = _instrumentHeuristic(problem, heuristic)
+    walls = problem.walls
+    width, height = walls.width, walls.height
+    directions = {(0, 1): Directions.NORTH, (0, -1): Directions.SOUTH,
+                  (1, 0): Directions.EAST, (-1, 0): Directions.WEST}
+
+    def isOpen(x, y):
+        return 0 <= x < width and 0 <= y < height and not walls[x][y]
+
+    def jumpHorizontally(x, y, dx):
+        while True:
+            x += dx
+            if not isOpen(x, y):
+                return None
+            if problem.isGoalState((x, y)):
+                return (x, y)
+            if (isOpen(x, y + 1) and not isOpen(x - dx, y + 1)) or \
+               (isOpen(x, y - 1) and not isOpen(x - dx, y - 1)):
+                return (x, y)
+
+    def jumpVertically(x, y, dy):
+        while True:
+            y += dy
+            if not isOpen(x, y):
+                return None
+            if problem.isGoalState((x, y)) or jumpHorizontally(x, y, 1) is not None \
+               or jumpHorizontally(x, y, -1) is not None:
+                return (x, y)
+
+    def jumpDirections(position, heading):
+        "The directions worth scanning from a jump point reached moving along heading."
+        if heading is None:
+            return list(directions)
+        dx, dy = heading
+        if dy != 0:
+            return [heading, (1, 0), (-1, 0)]
+        x, y = position
+        return [heading] + [(0, side) for side in (1, -1)
+                            if isOpen(x, y + side) and not isOpen(x - dx, y + side)]
+
+    # Search nodes are (position, heading) since the directions scanned
+    # from a jump point depend on how it was reached.
+    start = (problem.getStartState(), None)
+    parents, costs = {start: None}, {start: 0}
+    closed = set()
+    queue = _newFrontier(problem, util.PriorityQueue)
+    queue.push(start, heuristic(start[0], problem))
+
+    while not queue.isEmpty():
+        node = queue.pop()
+        if node in closed:
+            continue
+        position, heading = node
+        if problem.isGoalState(position):
+            path = []
+            while parents[node] is not None:
+                parent = parents[node]
+                steps = abs(node[0][0] - parent[0][0]) + abs(node[0][1] - parent[0][1])
+                path.extend([directions[node[1]]] * steps)
+                node = parent
+            path.reverse()
+            return path
+        closed.add(node)
+        _recordExpansions(problem, [position])
+
+        x, y = position
+        for dx, dy in jumpDirections(position, heading):
+            if dy == 0:
+                jumpPoint = jumpHorizontally(x, y, dx)
+            else:
+                jumpPoint = jumpVertically(x, y, dy)
+            if jumpPoint is None:
+                continue
+            child = (jumpPoint, (dx, dy))
+            cost = costs[node] + abs(jumpPoint[0] - x) + abs(jumpPoint[1] - y)
+            if child not in costs or cost < costs[child]:
+                costs[child] = cost
+                parents[child] = node
+                queue.update(child, cost + heuristic(jumpPoint, problem))
+    return []
+
+MEMORY_BOUND = 100000 # Default node budget for memoryBoundedAStarSearch
+
+class _BoundedNode(Node):
+    "A Node that also carries the bookkeeping memoryBoundedAStarSearch needs."
+    __slots__ = ('f', 'depth', 'liveChildren', 'forgotten', 'version')
+
+    def __init__(self, state, parent, action, cost, f):
+        Node.__init__(self, state, parent, action, cost)
+        self.f = f
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.liveChildren = 0
+        self.forgotten = None # state -> backed-up f of children dropped from memory
+        self.version = None   # Matches the node's current open list entry
+
+def memoryBoundedAStarSearch(problem, heuristic=nullHeuristic, maxNodes=MEMORY_BOUND):
+    """
+    Simplified memory-bounded A* (SMA*).  Works like A* until maxNodes search
+    nodes are in memory; from then on the worst leaf (highest f, shallowest)
+    is dropped after each expansion and its f is backed up into its parent.
+    A parent with dropped children goes back on the open list keyed on the
+    smallest backed-up f, and popping it regenerates those children with
+    their backed-up values.
+
+    A generated state is skipped when a node in memory already reaches it at
+    no greater cost.  Paths longer than maxNodes - 1 actions cannot be held
+    and are abandoned, so the search returns an optimal plan whenever one
+    fits in the budget and [] otherwise.  Between prunes the node count can
+    exceed maxNodes by one expansion.
+    """
+    infinity = float('inf')
+    nodeCount = [0]
+    best, worst = [], [] # Open list ordered best-first, and its leaves worst-first
+    bestNodes = {}       # state -> cheapest node in memory reaching it
+    counter = [0]
+
+    def addToOpen(node, key):
+        counter[0] += 1
+        node.version = counter[0]
+        heapq.heappush(best, (key, -node.depth, node.version, node))
+        if node.liveChildren == 0:
+            heapq.heappush(worst, (-key, node.depth, node.version, node))
+
+    def isLive(entry):
+        return entry[3].version == entry[2]
+
+    def forget(node):
+        node.version = None
+        nodeCount[0] -= 1
+        if bestNodes.get(node.state) is node:
+            del bestNodes[node.state]
+        parent = node.parent
+        if parent is None:
+            return
+        if parent.forgotten is None:
+            parent.forgotten = {}
+        parent.forgotten[node.state] = node.f
+        parent.liveChildren -= 1
+        key = min(parent.forgotten.values())
+        if parent.liveChildren == 0:
+            # A leaf again; it must be on the open list even at f = infinity
+            # so that it can be dropped in turn.
+            parent.f = key
+            addToOpen(parent, key)
+        elif key < infinity:
+            addToOpen(parent, key)
+
+    heuristic = _instrumentHeuristic(problem, heuristic)
+    start = problem.getStartState()
+    root = _BoundedNode(start, None, None, 0, heuristic(start, problem))
+    bestNodes[start] = root
+    nodeCount[0] = 1
+    addToOpen(root, root.f)
+
+    while best:
+        entry = heapq.heappop(best)
+        if not isLive(entry):
+            continue
+        key, node = entry[0], entry[3]
+        if key == infinity:
+            return []
+        node.version = None
+        if problem.isGoalState(node.state):
+            return node.getPath()
+
+        # Generate the successors, or regenerate the ones dropped earlier.
+        # Children still in memory are skipped by the cost check, and
+        # children known to be hopeless stay forgotten.
+        remembered = node.forgotten or {}
+        node.forgotten = None
+        for state, action, stepCost in problem.getSuccessors(node.state):
+            cost = node.cost + stepCost
+            known = bestNodes.get(state)
+            if known is not None and known.cost <= cost:
+                continue
+            backedUp = remembered.get(state, 0)
+            if backedUp == infinity or node.depth + 2 > maxNodes:
+                # Hopeless, or the path to this child would not fit in memory
+                if node.forgotten is None:
+                    node.forgotten = {}
+                node.forgotten[state] = infinity
+                continue
+            f = max(key, backedUp, cost + heuristic(state, problem)) # pathmax keeps f monotone
+            child = _BoundedNode(state, node, action, cost, f)
+            bestNodes[state] = child
+            node.liveChildren += 1
+            nodeCount[0] += 1
+            addToOpen(child, f)
+        if node.liveChildren == 0:
+            # Nothing below this node that is not hopeless or reached more
+            # cheaply elsewhere
+            node.f = infinity
+            forget(node)
+
+        while nodeCount[0] > maxNodes:
+            while worst and not (isLive(worst[0]) and worst[0][3].liveChildren == 0):
+                heapq.heappop(worst)
+            while best and not isLive(best[0]):
+                heapq.heappop(best)
+            if not worst or worst[0][3] is best[0][3]:
+                break # Never drop the best leaf
+            forget(heapq.heappop(worst)[3])
+
+        # Lazily deleted entries pile up once pruning starts; rebuild the
+        # heaps whenever they are mostly stale so memory stays bounded.
+        if len(best) + len(worst) > 4 * nodeCount[0] + 64:
+            best[:] = [e for e in best if isLive(e)]
+            worst[:] = [e for e in worst if isLive(e) and e[3].liveChildren == 0]
+            heapq.heapify(best)
+            heapq.heapify(worst)
+    return []
+
+ANYTIME_WEIGHT = 3.0      # Starting heuristic weight for weighted A* and ARA*
+ANYTIME_WEIGHT_STEP = 0.5 # How much ARA* lowers the weight after each plan
+
+class AnytimeReport:
+    """
+    What a budgeted search found before it stopped.  cost is the cost of
+    plan (None if no plan was found) and bound is how far from optimal it can
+    be: cost <= bound * optimal cost, provided the heuristic is consistent.
+    solutions lists (seconds, cost, bound) for every plan found, in order.
+    """
+    def __init__(self):
+        self.plan = None
+        self.cost = None
+        self.bound = float('inf')
+        self.weight = None
+        self.expanded = 0
+        self.exhausted = False
+        self.solutions = []
+
+    def __str__(self):
+        return 'cost %s, suboptimality bound %.3f, weight %s, %d expanded%s' % (
+            self.cost, self.bound, self.weight, self.expanded,
+            ' (budget exhausted)' if self.exhausted else '')
+
+def weightedAStarSearch(problem, heuristic=nullHeuristic, weight=ANYTIME_WEIGHT,
+                        maxTime=None, maxExpanded=None, report=None):
+    """
+    A* on g + weight * h.  With a consistent heuristic the plan costs at most
+    weight times the optimal cost, and usually far fewer nodes are expanded.
+    Stops early once maxTime seconds or maxExpanded expansions are used up,
+    returning [] if no plan was found by then.  Pass an AnytimeReport as
+    report to learn the plan's cost and a suboptimality bound, which is often
+    tighter than weight.
+    """
+    return _anytimeAStar(problem, heuristic, [weight], maxTime, maxExpanded, report)
+
+def anytimeRepairingAStarSearch(problem, heuristic=nullHeuristic, weight=ANYTIME_WEIGHT,
+                                weightStep=ANYTIME_WEIGHT_STEP, maxTime=None,
+                                maxExpanded=None, report=None):
+    """
+    Anytime Repairing A* (ARA*).  Finds a plan quickly with weighted A*, then
+    lowers the weight by weightStep and improves the plan, down to weight 1
+    where the plan is optimal.  Each pass reuses the work of the previous one:
+    only states whose cost improved since they were expanded are expanded
+    again.  When the budget runs out the best plan so far is returned, and
+    report (an AnytimeReport) records its suboptimality bound.
+    """
+    weights = [weight]
+    while weights[-1] > 1:
+        weights.append(max(1.0, weights[-1] - weightStep))
+    return _anytimeAStar(problem, heuristic, weights, maxTime, maxExpanded, report)
+
+def _anytimeAStar(problem, heuristic, weights, maxTime, maxExpanded, report):
+    """
+    Runs ARA*'s ImprovePath once for each weight in the decreasing list
+    weights, reusing costs and parents between passes, and returns the best
+    plan found.  Goals are noticed when generated, so a pass ends once no
+    open state has a key below the cost of the best goal.
+    """
+    heuristic = _instrumentHeuristic(problem, heuristic)
+    if report is None: report = AnytimeReport()
+    startTime = time.perf_counter()
+    deadline = startTime + maxTime if maxTime is not None else None
+    start = problem.getStartState()
+    costs, parents, hValues = {start: 0}, {start: None}, {}
+    def h(state):
+        if state not in hValues:
+            hValues[state] = heuristic(state, problem)
+        return hValues[state]
+
+    bestGoal = start if problem.isGoalState(start) else None
+    openStates, inconsistent = set([start]), set()
+    lowerBound = lambda: min([costs[s] + h(s) for s in openStates | inconsistent] or [costs[bestGoal]])
+
+    for weight in weights:
+        closed = set()
+        queue = _newFrontier(problem, util.PriorityQueue)
+        openStates |= inconsistent
+        inconsistent = set()
+        for state in openStates:
+            queue.push(state, costs[state] + weight * h(state))
+
+        while not queue.isEmpty():
+            state = queue.pop()
+            if state not in openStates or state in closed:
+                continue
+            key = costs[state] + weight * h(state)
+            if bestGoal is not None and costs[bestGoal] <= key:
+                break
+            if (maxExpanded is not None and report.expanded >= maxExpanded) or \
+               (deadline is not None and time.perf_counter() > deadline):
+                report.exhausted = True
+                break
+            openStates.discard(state)
+            closed.add(state)
+            report.expanded += 1
+            for child, action, stepCost in problem.getSuccessors(state):
+                cost = costs[state] + stepCost
+                if child in costs and cost >= costs[child]:
+                    continue
+                costs[child] = cost
+                parents[child] = (state, action, stepCost)
+                if problem.isGoalState(child) and (bestGoal is None or cost < costs[bestGoal]):
+                    bestGoal = child
+                if child in closed:
+                    inconsistent.add(child)
+                else:
+                    openStates.add(child)
+                    queue.update(child, cost + weight * h(child))
+
+        if bestGoal is not None:
+            cost, lowest = costs[bestGoal], lowerBound()
+            if cost == 0:
+                bound = 1.0
+            else:
+                bound = cost / float(lowest) if lowest > 0 else float('inf')
+            if not report.exhausted:
+                bound = min(bound, weight)
+            bound = max(1.0, bound)
+            if not report.solutions or (cost, bound) < report.solutions[-1][1:]:
+                report.solutions.append((time.perf_counter() - startTime, cost, bound))
+        if report.exhausted or (bestGoal is None and not openStates):
+            break
+        report.weight = weight # The last pass that ran to completion
+
+    if bestGoal is None:
+        return []
+    # Parents may have improved since bestGoal's cost was set, so the plan
+    # can be cheaper than costs[bestGoal]
+    path, pathCost = [], 0
+    state = bestGoal
+    while parents[state] is not None:
+        state, action, stepCost = parents[state]
+        path.append(action)
+        pathCost += stepCost
+    path.reverse()
+    report.plan, report.cost = path, pathCost
+    report.bound = min([bound for _, _, bound in report.solutions])
+    return path
+
+##########################################
+# INSTRUMENTATION                        #
+##########################################
+
+class SearchStats:
+    """
+    Counters and timers filled in while a search runs on an
+    InstrumentedProblem.  Nodes are expanded once per getSuccessors (or
+    getPredecessors) call and generated once per successor returned.  A
+    duplicate push is a frontier push of a state that was pushed before.
+    Searches that keep their own frontier rather than a util queue (bibfs,
+    idastar, smastar) report None for the frontier fields.
+    """
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.pushes = 0
+        self.duplicatePushes = 0
+        self.peakFrontier = 0
+        self.heuristicCalls = 0
+        self.successorTime = 0.0
+        self.heuristicTime = 0.0
+        self.queueTime = 0.0
+        self.totalTime = 0.0
+        self.depth = None
+        self.frontierTracked = False
+        self.pushedStates = set()
+
+    def effectiveBranchingFactor(self):
+        """
+        The branching factor b* of a uniform tree of the solution's depth d
+        holding as many nodes as were generated: N + 1 = 1 + b* + ... + b*^d.
+        """
+        d, n = self.depth, self.generated
+        if not d or n <= d: return 1.0 if d else None
+        def treeSize(b):
+            return sum(b ** i for i in range(1, d + 1))
+        low, high = 1.0, n ** (1.0 / d) # b*^d <= N, so b* <= N^(1/d)
+        for _ in range(100):
+            middle = (low + high) / 2
+            if treeSize(middle) < n:
+                low = middle
+            else:
+                high = middle
+        return (low + high) / 2
+
+    def asDict(self):
+        tracked = self.frontierTracked
+        return {'expanded': self.expanded,
+                'generated': self.generated,
+                'pushes': self.pushes if tracked else None,
+                'duplicatePushes': self.duplicatePushes if tracked else None,
+                'peakFrontier': self.peakFrontier if tracked else None,
+                'heuristicCalls': self.heuristicCalls,
+                'successorTime': self.successorTime,
+                'heuristicTime': self.heuristicTime,
+                'queueTime': self.queueTime if tracked else None,
+                'totalTime': self.totalTime,
+                'depth': self.depth,
+                'effectiveBranchingFactor': self.effectiveBranchingFactor()}
+
+    def toJson(self):
+        "The stats as a single JSON line."
+        import json
+        return json.dumps(self.asDict(), sort_keys=True)
+
+class InstrumentedProblem:
+    """
+    Wraps a SearchProblem so a search run on it fills in a SearchStats.
+    getSuccessors and getPredecessors are counted and timed here; frontiers
+    and heuristics are instrumented by the search functions themselves, via
+    _newFrontier and _instrumentHeuristic, only when they are handed an
+    InstrumentedProblem.  Searches on plain problems pay nothing.
+    """
+    def __init__(self, problem, stats=None):
+        self.problem = problem
+        self.stats = stats if stats is not None else SearchStats()
+
+    def getSuccessors(self, state):
+        start = time.perf_counter()
+        successors = self.problem.getSuccessors(state)
+        self.stats.successorTime += time.perf_counter() - start
+        self.stats.expanded += 1
+        self.stats.generated += len(successors)
+        return successors
+
+    def getPredecessors(self, state):
+        start = time.perf_counter()
+        predecessors = self.problem.getPredecessors(state)
+        self.stats.successorTime += time.perf_counter() - start
+        self.stats.expanded += 1
+        self.stats.generated += len(predecessors)
+        return predecessors
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+class _InstrumentedFrontier:
+    "Times a util.Stack, Queue or PriorityQueue and tracks its size and pushes."
+    def __init__(self, frontier, stats):
+        self.frontier = frontier
+        self.stats = stats
+        self.size = 0
+
+    def _pushed(self, item):
+        stats = self.stats
+        state = getattr(item, 'state', item)
+        try:
+            if state in stats.pushedStates:
+                stats.duplicatePushes += 1
+            else:
+                stats.pushedStates.add(state)
+        except TypeError:
+            pass
+        stats.pushes += 1
+        self.size += 1
+        if self.size > stats.peakFrontier:
+            stats.peakFrontier = self.size
+
+    def push(self, item, *priority):
+        start = time.perf_counter()
+        self.frontier.push(item, *priority)
+        self.stats.queueTime += time.perf_counter() - start
+        self._pushed(item)
+
+    def update(self, item, priority):
+        try:
+            isNew = item not in self.frontier.entryFinder
+        except TypeError:
+            isNew = True
+        start = time.perf_counter()
+        self.frontier.update(item, priority)
+        self.stats.queueTime += time.perf_counter() - start
+        if isNew:
+            self._pushed(item)
+
+    def pop(self):
+        start = time.perf_counter()
+        item = self.frontier.pop()
+        self.stats.queueTime += time.perf_counter() - start
+        self.size -= 1
+        return item
+
+    def isEmpty(self):
+        start = time.perf_counter()
+        empty = self.frontier.isEmpty()
+        self.stats.queueTime += time.perf_counter() - start
+        return empty
+
+def _newFrontier(problem, frontierClass):
+    "Returns a new frontierClass(), instrumented if problem is an InstrumentedProblem."
+    if isinstance(problem, InstrumentedProblem):
+        problem.stats.frontierTracked = True
+        return _InstrumentedFrontier(frontierClass(), problem.stats)
+    return frontierClass()
+
+def _instrumentHeuristic(problem, heuristic):
+    """
+    Returns heuristic unchanged for plain problems.  For an InstrumentedProblem
+    it returns a timed version that passes the wrapped problem through, so the
+    heuristic sees exactly the object it would have seen without stats.
+    """
+    if not isinstance(problem, InstrumentedProblem):
+        return heuristic
+    stats, inner = problem.stats, problem.problem
+    def timedHeuristic(state, searchProblem=None):
+        if searchProblem is problem: searchProblem = inner
+        start = time.perf_counter()
+        value = heuristic(state, searchProblem)
+        stats.heuristicTime += time.perf_counter() - start
+        stats.heuristicCalls += 1
+        return value
+    return timedHeuristic
+
+def instrumentedSearch(searchFunction, problem, *args, **kwargs):
+    """
+    Runs searchFunction(problem, *args, **kwargs) on an InstrumentedProblem
+    and returns (actions, stats), where stats is a SearchStats.
+    """
+    wrapped = InstrumentedProblem(problem)
+    start = time.perf_counter()
+    actions = searchFunction(wrapped, *args, **kwargs)
+    stats = wrapped.stats
+    stats.totalTime = time.perf_counter() - start
+    stats.depth = len(actions)
+    stats.pushedStates = set()
+    return actions, stats
 
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+bibfs = bidirectionalBreadthFirstSearch
+biastar = bidirectionalAStarSearch
+idastar = iterativeDeepeningAStarSearch
+smastar = memoryBoundedAStarSearch
+jps = jumpPointSearch
+fbfs = frontierBreadthFirstSearch
+wastar = weightedAStarSearch
+arastar = anytimeRepairingAStarSearch
@@ -37,9 +37,17 @@ Good luck and happy searching!
 from game import Directions
 from game import Agent
 from game import Actions
-import util
+from game import PackedGrid
 import time
+import collections
+import layout
 import search
+import distanceOracle
+import planCache
+
+# The modules whose source a cached plan depends on: the searches, the
+# problems and heuristics, and the grids, layouts and distances they read
+PLAN_SOURCE_MODULES = ['search', 'searchAgents', 'util', 'game', 'layout', 'distanceOracle']
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -68,12 +76,41 @@ class SearchAgent(Agent):
     Options for fn include:
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
+      bidirectionalBreadthFirstSearch or bibfs
+      bidirectionalAStarSearch or biastar
+      iterativeDeepeningAStarSearch or idastar
+      memoryBoundedAStarSearch or smastar
+      jumpPointSearch or jps
+      weightedAStarSearch or wastar
+      anytimeRepairingAStarSearch or arastar
+
+    With stats=True the search runs on a search.InstrumentedProblem and its
+    SearchStats are printed as a JSON line after the path is found.
+
+    With cache=True plans are looked up in the process-wide plan cache (see
+    planCache.py) before searching, and with cache=disk also in the on-disk
+    store, so repeated games on the same board only search once.
 
+    With junctions=True the search runs on a JunctionSearchProblem over the
+    problem, expanding maze junctions instead of cells; this needs a problem
+    whose states are positions.
 
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    collectStats = False
+    cachePlans = False
+    diskPlans = False
+    useJunctions = False
+    functionName = ''
+    heuristicName = ''
+
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', stats='False', cache='False', junctions='False'):
+        self.collectStats = stats == True or str(stats).lower() == 'true'
+        self.useJunctions = junctions == True or str(junctions).lower() == 'true'
+        self.cachePlans = cache == True or str(cache).lower() in ('true', 'disk')
+        self.diskPlans = str(cache).lower() == 'disk'
+        self.functionName = fn
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
@@ -91,6 +128,7 @@ class SearchAgent(Agent):
             else:
                 raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
+            self.heuristicName = heuristic
             # Note: this bit of Python trickery combines the search algorithm and the heuristic
             self.searchFunction = lambda x: func(x, heuristic=heur)
 
@@ -112,10 +150,36 @@ class SearchAgent(Agent):
         if self.searchFunction == None: raise Exception("No search function provided for SearchAgent")
         starttime = time.time()
         problem = self.searchType(state) # Makes a new search problem
-        self.actions  = self.searchFunction(problem) # Find a path
+        searchProblem = JunctionSearchProblem(problem) if self.useJunctions else problem
+        cache, cached = planCache.getPlanCache(), None
+        if self.cachePlans:
+            problemName = self.searchType.__name__ + ('/junctions' if self.useJunctions else '')
+            key = planCache.planKey(state, type(self).__name__, problemName,
+                                    self.functionName, self.heuristicName,
+                                    planCache.sourceDigest(PLAN_SOURCE_MODULES))
+            cached = cache.get(key, self.diskPlans)
+        if cached is not None:
+            self.actions = cached
+        elif self.collectStats:
+            self.actions, self.searchStats = search.instrumentedSearch(self.searchFunction, searchProblem)
+        else:
+            self.actions  = self.searchFunction(searchProblem) # Find a path
+        if self.useJunctions and cached is None:
+            self.actions = searchProblem.getPrimitiveActions(self.actions)
+        if self.cachePlans and cached is None:
+            cache.put(key, self.actions, self.diskPlans)
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
+        if self.cachePlans:
+            print('Plan cache %s: %d hits, %d misses' % ('hit' if cached is not None else 'miss', cache.hits, cache.misses))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if '_heuristicCaches' in dir(problem):
+            for heuristic, heuristicCache in problem._heuristicCaches.items():
+                stats = heuristicCache.getStats()
+                print('Heuristic cache for %s: %d hits, %d misses (%.1f%% hit rate), ~%.2f seconds saved' %
+                      (heuristic.__name__, stats['hits'], stats['misses'], 100 * stats['hitRate'], stats['timeSaved']))
+        if self.collectStats and cached is None: print('Search stats: ' + self.searchStats.toJson())
+        self.actionIndex = 0 # Restart the plan in every game, not only the first
 
     def getAction(self, state):
         """
@@ -133,6 +197,10 @@ class SearchAgent(Agent):
         else:
             return Directions.STOP
 
+def unitCost(position):
+    "The default costFn of the position problems: every step costs 1."
+    return 1
+
 class PositionSearchProblem(search.SearchProblem):
     """
     A search problem defines the state space, start state, goal test, successor
@@ -144,7 +212,7 @@ class PositionSearchProblem(search.SearchProblem):
     Note: this search problem is fully specified; you should NOT change it.
     """
 
-    def __init__(self, gameState, costFn = lambda x: 1, goal=(1,1), start=None, warn=True, visualize=True):
+    def __init__(self, gameState, costFn = unitCost, goal=(1,1), start=None, warn=True, visualize=True):
         """
         Stores the start and goal.
 
@@ -153,6 +221,7 @@ class PositionSearchProblem(search.SearchProblem):
         goal: A position in the gameState
         """
         self.walls = gameState.getWalls()
+        self.neighborTable = distanceOracle.getNeighborTable(self.walls)
         self.startState = gameState.getPacmanPosition()
         if start != None: self.startState = start
         self.goal = goal
@@ -192,15 +261,12 @@ class PositionSearchProblem(search.SearchProblem):
          cost of expanding to that successor
         """
 
-        successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                cost = self.costFn(nextState)
-                successors.append( ( nextState, action, cost) )
+        if self.costFn is unitCost:
+            successors = list(self.neighborTable.unitSuccessors[state])
+        else:
+            costFn = self.costFn
+            successors = [(nextState, action, costFn(nextState))
+                          for nextState, action in self.neighborTable.successors[state]]
 
         # Bookkeeping for display purposes
         self._expanded += 1 # DO NOT CHANGE
@@ -210,6 +276,30 @@ class PositionSearchProblem(search.SearchProblem):
 
         return successors
 
+    def hasUnitCosts(self):
+        "True when every step costs 1, as jumpPointSearch and frontierBreadthFirstSearch need."
+        return self.costFn is unitCost
+
+    def getGoalState(self):
+        return self.goal
+
+    def getPredecessors(self, state):
+        """
+        Returns the states from which one action reaches state, as triples
+        (predecessor, action, stepCost).  Used by the bidirectional searches.
+        """
+
+        cost = self.costFn(state)
+        predecessors = [(prevState, action, cost) for prevState, action in self.neighborTable.predecessors[state]]
+
+        # Bookkeeping for display purposes
+        self._expanded += 1
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -226,6 +316,62 @@ class PositionSearchProblem(search.SearchProblem):
             cost += self.costFn((x,y))
         return cost
 
+class JunctionSearchProblem(search.SearchProblem):
+    """
+    Runs a problem whose states are positions, such as a
+    PositionSearchProblem or AnyFoodSearchProblem, on the JunctionGraph of
+    its walls (see layout.py).  Each successor follows a whole corridor to
+    the next junction, stopping early at a goal cell, so searches expand
+    junctions instead of cells.  The action of a successor is the tuple of
+    Directions along the corridor and its cost is the sum of the wrapped
+    problem's costFn over the cells entered; getPrimitiveActions turns a
+    plan back into single Directions.  Anything else is looked up on the
+    wrapped problem, so heuristics can read problem.goal and the like.
+    """
+    def __init__(self, problem):
+        self.problem = problem
+        self.graph = layout.getJunctionGraph(problem.walls)
+
+    def getStartState(self):
+        return self.problem.getStartState()
+
+    def isGoalState(self, state):
+        return self.problem.isGoalState(state)
+
+    def getSuccessors(self, state):
+        costFn = getattr(self.problem, 'costFn', lambda position: 1)
+        successors = []
+        for end, actions, cells in self.graph.getExits(state):
+            path = cells + (end,)
+            for steps, cell in enumerate(cells):
+                if self.problem.isGoalState(cell):
+                    path = cells[:steps + 1]
+                    break
+            successors.append((path[-1], actions[:len(path)], sum([costFn(cell) for cell in path])))
+
+        # Bookkeeping for display purposes
+        if '_expanded' in dir(self.problem):
+            self.problem._expanded += 1
+            if state not in self.problem._visited:
+                self.problem._visited[state] = True
+                self.problem._visitedlist.append(state)
+
+        return successors
+
+    def getPrimitiveActions(self, actions):
+        "Expands a plan of corridor moves into single Directions."
+        primitive = []
+        for action in actions:
+            primitive.extend(action)
+        return primitive
+
+    def getCostOfActions(self, actions):
+        if actions == None: return 999999
+        return self.problem.getCostOfActions(self.getPrimitiveActions(actions))
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
 class StayEastSearchAgent(SearchAgent):
     """
     An agent for position search with a cost function that penalizes being in
@@ -288,6 +434,36 @@ class CornersProblem(search.SearchProblem):
         # Please add any code here which you would like to use
         # in initializing the problem
         "*** YOUR CODE HERE ***"
+        # States are (position, mask) where bit i of mask is set while
+        # self.corners[i] is still unvisited.
+        self.neighborTable = distanceOracle.getNeighborTable(self.walls)
+        self.allCorners = (1 << len(self.corners)) - 1
+        self.cornerBits = {}
+        for i, corner in enumerate(self.corners):
+            self.cornerBits[corner] = self.cornerBits.get(corner, 0) | (1 << i)
+        self._buildCornerTables()
+
+    def _buildCornerTables(self):
+        """
+        Precomputes, for cornersHeuristic, the maze distance from each corner
+        to every cell and, for every corner i and mask of corners, the length
+        of the shortest tour that starts at corner i and visits the corners in
+        mask.  Unreachable corners count as distance 0.
+        """
+        oracle = distanceOracle.getDistanceOracle(self.walls)
+        self.cornerDistances = []
+        for corner in self.corners:
+            if oracle.hasCell(corner):
+                self.cornerDistances.append(oracle.getDistancesFrom(corner))
+            else:
+                self.cornerDistances.append({})
+        n = len(self.corners)
+        between = [[self.cornerDistances[i].get(self.corners[j], 0) for j in range(n)] for i in range(n)]
+        self.cornerTours = [[0] * (1 << n) for i in range(n)]
+        for mask in range(1, 1 << n): # Submasks are smaller, so already filled in
+            for i in range(n):
+                self.cornerTours[i][mask] = min(between[i][j] + self.cornerTours[j][mask & ~(1 << j)]
+                                                for j in range(n) if mask & (1 << j))
 
     def getStartState(self):
         """
@@ -295,14 +471,14 @@ class CornersProblem(search.SearchProblem):
         space)
         """
         "*** YOUR CODE HERE ***"
-        return self.startingPosition, self.corners
+        return self.startingPosition, self.allCorners
 
     def isGoalState(self, state):
         """
         Returns whether this search state is a goal state of the problem.
         """
         "*** YOUR CODE HERE ***"
-        return len(state[1]) == 0
+        return state[1] == 0
 
     def getSuccessors(self, state):
         """
@@ -315,31 +491,12 @@ class CornersProblem(search.SearchProblem):
             is the incremental cost of expanding to that successor
         """
 
-        successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            # Add a successor state to the successor list if the action is legal
-            # Here's a code snippet for figuring out whether a new position hits a wall:
-            #   x,y = currentPosition
-            #   dx, dy = Actions.directionToVector(action)
-            #   nextx, nexty = int(x + dx), int(y + dy)
-            #   hitsWall = self.walls[nextx][nexty]
-
-            "*** YOUR CODE HERE ***"
-            x,y = state[0]
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            hitsWall = self.walls[nextx][nexty]
-            
-            if hitsWall:
-                continue
-            
-            corners = []
-            for i in range(len(state[1])):
-                if state[1][i] != (nextx, nexty):
-                    corners.append(state[1][i])
-            corners = tuple(corners)
-
-            successors.append((((nextx, nexty), corners), action, 1))
+        "*** YOUR CODE HERE ***"
+        # The neighbor table already holds the legal moves out of each cell
+        position, mask = state
+        cornerBits = self.cornerBits
+        successors = [((nextPosition, mask & ~cornerBits.get(nextPosition, 0)), action, 1)
+                      for nextPosition, action in self.neighborTable.successors[position]]
 
         self._expanded += 1 # DO NOT CHANGE
         return successors
@@ -375,15 +532,20 @@ def cornersHeuristic(state, problem):
     walls = problem.walls # These are the walls of the maze, as a Grid (game.py)
 
     "*** YOUR CODE HERE ***"
-    if len(state[1]) == 0:
+    # The shortest tour through the remaining corners under true maze
+    # distances: reach some corner i first, then follow the precomputed best
+    # tour from i through the rest.
+    position, mask = state
+    if mask == 0:
         return 0
-    
-    # Using max of Manhattan distances of corners
-    maxDistance = 0
-    for corner in state[1]:
-        maxDistance = max(maxDistance, util.manhattanDistance(corner, state[0]))
-
-    return maxDistance
+    best = None
+    for i in range(len(corners)):
+        bit = 1 << i
+        if mask & bit:
+            cost = problem.cornerDistances[i].get(position, 0) + problem.cornerTours[i][mask & ~bit]
+            if best is None or cost < best:
+                best = cost
+    return best
 
 class AStarCornersAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
@@ -398,11 +560,15 @@ class FoodSearchProblem:
 
     A search state in this problem is a tuple ( pacmanPosition, foodGrid ) where
       pacmanPosition: a tuple (x,y) of integers specifying Pacman's position
-      foodGrid:       a Grid (see game.py) of either True or False, specifying remaining food
+      foodGrid:       a PackedGrid (see game.py) of either True or False, specifying remaining food
+
+    The food is kept as an immutable PackedGrid rather than a Grid, so each
+    successor shares no mutable state with its parent and hashes in O(1).
     """
     def __init__(self, startingGameState):
-        self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
+        self.start = (startingGameState.getPacmanPosition(), PackedGrid.fromGrid(startingGameState.getFood()))
         self.walls = startingGameState.getWalls()
+        self.neighborTable = distanceOracle.getNeighborTable(self.walls)
         self.startingGameState = startingGameState
         self._expanded = 0 # DO NOT CHANGE
         self.heuristicInfo = {} # A dictionary for the heuristic to store information
@@ -415,17 +581,10 @@ class FoodSearchProblem:
 
     def getSuccessors(self, state):
         "Returns successor states, the actions they require, and a cost of 1."
-        successors = []
         self._expanded += 1 # DO NOT CHANGE
-        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state[0]
-            dx, dy = Actions.directionToVector(direction)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextFood = state[1].copy()
-                nextFood[nextx][nexty] = False
-                successors.append( ( ((nextx, nexty), nextFood), direction, 1) )
-        return successors
+        food = state[1]
+        return [((nextPosition, food.withoutCell(*nextPosition)), direction, 1)
+                for nextPosition, direction in self.neighborTable.successors[state[0]]]
 
     def getCostOfActions(self, actions):
         """Returns the cost of a particular sequence of actions.  If those actions
@@ -447,6 +606,24 @@ class AStarFoodSearchAgent(SearchAgent):
         self.searchFunction = lambda prob: search.aStarSearch(prob, foodHeuristic)
         self.searchType = FoodSearchProblem
 
+class AnytimeFoodSearchAgent(SearchAgent):
+    """
+    A SearchAgent for FoodSearchProblem using ARA* and foodHeuristic, which
+    plans for at most maxTime seconds and eats along the best plan found by
+    then.  Its cost and suboptimality bound are printed after planning.
+    """
+    def __init__(self, weight='3.0', maxTime='1.0'):
+        self.report = None
+        self.searchFunction = lambda prob: search.anytimeRepairingAStarSearch(
+            prob, foodHeuristic, float(weight), maxTime=float(maxTime), report=self.report)
+        self.searchType = FoodSearchProblem
+
+    def registerInitialState(self, state):
+        self.report = search.AnytimeReport()
+        SearchAgent.registerInitialState(self, state)
+        print('Anytime search: %s' % self.report)
+
+@search.memoizeHeuristic
 def foodHeuristic(state, problem):
     """
     Your heuristic for the FoodSearchProblem goes here.
@@ -460,8 +637,8 @@ def foodHeuristic(state, problem):
     other hand, inadmissible or inconsistent heuristics may find optimal
     solutions, so be careful.
 
-    The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a Grid
-    (see game.py) of either True or False. You can call foodGrid.asList() to get
+    The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a
+    PackedGrid (see game.py) of either True or False. You can call foodGrid.asList() to get
     a list of food coordinates instead.
 
     If you want access to info like walls, capsules, etc., you can query the
@@ -478,18 +655,137 @@ def foodHeuristic(state, problem):
     position, foodGrid = state
     "*** YOUR CODE HERE ***"
 
-    # Using max of game distances
-    maxDistance = 0
-    for food in foodGrid.asList():
-        if not food:
-            continue
-        maxDistance = max(maxDistance, mazeDistance(position, food, problem.startingGameState))
-    return maxDistance
+    # The distance to the nearest food plus the weight of a minimum spanning
+    # tree over the remaining food, both under maze distances.  Any path that
+    # eats every pellet first reaches some pellet and then connects all of
+    # them, so this never overestimates; eating a pellet removes at most the
+    # edge that joined it to its nearest neighbor, so it is also consistent.
+    if foodGrid.count() == 0:
+        return 0
+    info = problem.heuristicInfo
+    if 'foodIds' not in info:
+        _initFoodDistances(problem)
+    oracle = info['oracle']
+    nearest = oracle.getNearest(position, foodGrid.asList())[0] or 0
+    return nearest + _foodSpanningTree(problem, foodGrid, position)[0]
+
+def _initFoodDistances(problem):
+    """
+    Numbers the food of the start state and caches the maze distance between
+    every pair in problem.heuristicInfo.  Unreachable pairs count as 0.
+    """
+    info = problem.heuristicInfo
+    oracle = distanceOracle.getDistanceOracle(problem.walls)
+    foods = problem.getStartState()[1].asList()
+    foodDistances = []
+    for food in foods:
+        row = []
+        for other in foods:
+            d = oracle.getDistance(food, other) if oracle.hasCell(food) and oracle.hasCell(other) else None
+            row.append(d or 0)
+        foodDistances.append(row)
+    info['oracle'] = oracle
+    info['foodIds'] = dict((food, i) for i, food in enumerate(foods))
+    info['foodDistances'] = foodDistances
+    # food PackedGrid -> (weight, edges), least recently used first
+    info['spanningTrees'] = collections.OrderedDict()
+
+def _foodSpanningTree(problem, foodGrid, position):
+    """
+    Returns (weight, edges) of a minimum spanning tree over the food in
+    foodGrid, with edges as pairs of food ids.  Trees are cached per food set,
+    in an LRU of search.HEURISTIC_CACHE_SIZE entries like the heuristic's own.
+    When Pacman has just eaten the pellet at position, the parent's food set
+    is foodGrid plus that pellet, and its tree is reused: dropping the pellet
+    splits the tree into components that only need to be rejoined.
+    """
+    info = problem.heuristicInfo
+    trees = info['spanningTrees']
+    tree = trees.get(foodGrid)
+    if tree is not None:
+        trees.move_to_end(foodGrid)
+        return tree
+    foodIds, distances = info['foodIds'], info['foodDistances']
+    ids = [foodIds[food] for food in foodGrid.asList()]
+    parentTree = None
+    if position in foodIds:
+        parentTree = trees.get(foodGrid.withCell(*position))
+    if parentTree is not None:
+        tree = _spanningTreeWithout(parentTree, foodIds[position], ids, distances)
+    else:
+        tree = _primSpanningTree(ids, distances)
+    trees[foodGrid] = tree
+    if len(trees) > search.HEURISTIC_CACHE_SIZE:
+        trees.popitem(last=False)
+    return tree
+
+def _primSpanningTree(ids, distances):
+    "Prim's algorithm over the complete graph on ids."
+    if not ids:
+        return 0, []
+    weight, edges = 0, []
+    rest = ids[1:]
+    best = dict((i, (distances[ids[0]][i], ids[0])) for i in rest)
+    while best:
+        i = min(best, key=lambda j: best[j][0])
+        d, j = best.pop(i)
+        weight += d
+        edges.append((j, i))
+        row = distances[i]
+        for k in best:
+            if row[k] < best[k][0]:
+                best[k] = (row[k], i)
+    return weight, edges
+
+def _spanningTreeWithout(tree, removed, ids, distances):
+    """
+    The minimum spanning tree of ids, given the minimum spanning tree over ids
+    plus removed.  Its other edges stay in the new tree.  A removed leaf only
+    loses its edge; otherwise Kruskal's algorithm reconnects the pieces with
+    the cheapest edges between them.
+    """
+    weight, edges = tree
+    kept = []
+    for edge in edges:
+        if removed in edge:
+            weight -= distances[edge[0]][edge[1]]
+        else:
+            kept.append(edge)
+    if len(kept) == len(edges) - 1:
+        return weight, kept
+
+    component = dict((i, i) for i in ids)
+    def find(i):
+        while component[i] != i:
+            component[i] = component[component[i]]
+            i = component[i]
+        return i
+    for i, j in kept:
+        component[find(i)] = find(j)
+    candidates = []
+    for a in range(len(ids)):
+        for b in range(a + 1, len(ids)):
+            i, j = ids[a], ids[b]
+            if find(i) != find(j):
+                candidates.append((distances[i][j], i, j))
+    candidates.sort()
+    pieces = len(ids) - len(kept)
+    for d, i, j in candidates:
+        if pieces == 1:
+            break
+        rootI, rootJ = find(i), find(j)
+        if rootI != rootJ:
+            component[rootI] = rootJ
+            kept.append((i, j))
+            weight += d
+            pieces -= 1
+    return weight, kept
 
 class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
     def registerInitialState(self, state):
         self.actions = []
+        self.foodField = None
         currentState = state
         while(currentState.getFood().count() > 0):
             nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
@@ -512,10 +808,17 @@ class ClosestDotSearchAgent(SearchAgent):
         startPosition = gameState.getPacmanPosition()
         food = gameState.getFood()
         walls = gameState.getWalls()
-        problem = AnyFoodSearchProblem(gameState)
 
         "*** YOUR CODE HERE ***"
-        return search.aStarSearch(AnyFoodSearchProblem(gameState))
+        # One nearest-food field serves every call, repaired as pellets are
+        # eaten, instead of a fresh AnyFoodSearchProblem search per pellet.
+        # Pacman has eaten whatever was under it, usually the last target.
+        if getattr(self, 'foodField', None) is None or self.foodField.walls != walls:
+            self.foodField = distanceOracle.NearestFoodField(walls, food)
+        else:
+            self.foodField.removeFood(startPosition)
+            self.foodField.syncFood(food)
+        return self.foodField.getPathToNearest(startPosition) or []
 
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
@@ -539,8 +842,9 @@ class AnyFoodSearchProblem(PositionSearchProblem):
 
         # Store info for the PositionSearchProblem (no need to change this)
         self.walls = gameState.getWalls()
+        self.neighborTable = distanceOracle.getNeighborTable(self.walls)
         self.startState = gameState.getPacmanPosition()
-        self.costFn = lambda x: 1
+        self.costFn = unitCost
         self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
 
     def isGoalState(self, state):
@@ -553,11 +857,19 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         "*** YOUR CODE HERE ***"
         return self.food[x][y]
 
+    def getGoalState(self):
+        raise Exception('AnyFoodSearchProblem has no single goal state: the bidirectional '
+                        'searches (bibfs, biastar) need one, so use a one-way search instead')
+
+    def getPredecessors(self, state):
+        self.getGoalState() # Raises: there is no goal to search backward from
+
 def mazeDistance(point1, point2, gameState):
     """
-    Returns the maze distance between any two points, using the search functions
-    you have already built. The gameState can be any game state -- Pacman's
-    position in that state is ignored.
+    Returns the maze distance between any two points, looked up in the
+    all-pairs table of the shared DistanceOracle for this wall layout. The
+    gameState can be any game state -- Pacman's position in that state is
+    ignored.
 
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
@@ -568,5 +880,6 @@ def mazeDistance(point1, point2, gameState):
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    distance = distanceOracle.getDistanceOracle(walls).getDistance(point1, point2)
+    if distance is None: return 0 # Matches the empty plan bfs finds for unreachable points
+    return distance
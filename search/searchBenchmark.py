@@ -0,0 +1,281 @@
+# searchBenchmark.py
+# ------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Headless benchmark of the search algorithms in search.py on the problems in
+searchAgents.py.  Every combination of algorithm, problem, heuristic (for
+searches that take one) and layout in layouts/ is solved without a display,
+and the wall time, nodes expanded, path cost and peak memory of each run are
+recorded.
+
+> python searchBenchmark.py -c results.csv -j results.json
+> python searchBenchmark.py -l tinyMaze,mediumCorners --save-baseline baseline.json
+> python searchBenchmark.py -b baseline.json
+
+With -b, each run is compared with the same run in the baseline and any
+change in expansions or path cost, or a slowdown or memory growth beyond the
+tolerance, is reported as a regression; the exit status is then 1.
+
+benchmarkBaseline.json holds the default suite, saved with --save-baseline.
+Its expansions and costs hold on any machine, but its times and memory were
+measured on one.  Elsewhere, save a baseline of your own before changing
+the code, or widen -t to check only expansions and costs:
+
+> python searchBenchmark.py -b benchmarkBaseline.json -t 1000
+
+Runs that would take too long (BFS on the food problems of the big layouts,
+for example) are stopped after --max-expanded expansions or --max-time
+seconds and recorded with status 'budget'.  Nothing here imports a display
+module, so the benchmark can run on machines without Tk.
+"""
+
+import contextlib
+import csv
+import gc
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import distanceOracle
+import layout
+import pacman
+import search
+import searchAgents
+
+ALGORITHMS = ['dfs', 'bfs', 'ucs', 'astar']
+PROBLEMS = {
+    'PositionSearchProblem': ['nullHeuristic', 'manhattanHeuristic', 'euclideanHeuristic'],
+    'CornersProblem': ['nullHeuristic', 'cornersHeuristic'],
+    'FoodSearchProblem': ['nullHeuristic', 'foodHeuristic'],
+}
+FIELDS = ['layout', 'problem', 'algorithm', 'heuristic', 'status',
+          'time', 'expanded', 'cost', 'peakMemory']
+
+class BudgetExceeded(Exception):
+    pass
+
+def _budgeted(getSuccessors, maxExpanded, deadline):
+    "Wraps getSuccessors so it raises BudgetExceeded once either limit is hit."
+    calls = [0]
+    def budgetedGetSuccessors(state):
+        calls[0] += 1
+        if calls[0] > maxExpanded or time.perf_counter() > deadline:
+            raise BudgetExceeded()
+        return getSuccessors(state)
+    return budgetedGetSuccessors
+
+def _solve(gameState, problemName, algorithm, heuristic, maxExpanded, maxTime):
+    """
+    Builds a fresh problem and solves it.  Returns (seconds, problem, actions),
+    or raises BudgetExceeded.  Warnings printed by the problems are dropped.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        problem = getattr(searchAgents, problemName)(gameState)
+        start = time.perf_counter()
+        problem.getSuccessors = _budgeted(problem.getSuccessors, maxExpanded, start + maxTime)
+        searchFunction = getattr(search, algorithm)
+        if heuristic is None:
+            actions = searchFunction(problem)
+        else:
+            heuristicModule = searchAgents if heuristic in dir(searchAgents) else search
+            actions = searchFunction(problem, heuristic=getattr(heuristicModule, heuristic))
+        return time.perf_counter() - start, problem, actions
+
+def runOne(gameState, layoutName, problemName, algorithm, heuristic, options):
+    "Runs one combination and returns its result row as a dict."
+    row = {'layout': layoutName, 'problem': problemName, 'algorithm': algorithm,
+           'heuristic': heuristic or '-', 'status': 'ok', 'time': None,
+           'expanded': None, 'cost': None, 'peakMemory': None}
+    try:
+        if options.memory:
+            # Measured on its own pass since tracing slows the search down.
+            # It also warms shared caches, such as the distance oracle,
+            # before the timed pass.  A full collection first empties the
+            # interpreter's free lists, whose reused objects tracemalloc
+            # would not see, so the peak does not depend on earlier runs.
+            gc.collect()
+            tracemalloc.start()
+            try:
+                _solve(gameState, problemName, algorithm, heuristic, options.maxExpanded, options.maxTime)
+                row['peakMemory'] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        seconds, problem, actions = _solve(gameState, problemName, algorithm, heuristic,
+                                           options.maxExpanded, options.maxTime)
+    except BudgetExceeded:
+        row['status'] = 'budget'
+        return row
+    row['time'] = round(seconds, 6)
+    row['expanded'] = problem._expanded
+    row['cost'] = problem.getCostOfActions(actions)
+    return row
+
+def combinations(algorithms, problems):
+    "Yields (problem, algorithm, heuristic); heuristic is None for uninformed searches."
+    for problemName in problems:
+        for algorithm in algorithms:
+            if 'heuristic' in getattr(search, algorithm).__code__.co_varnames:
+                for heuristic in PROBLEMS[problemName]:
+                    yield problemName, algorithm, heuristic
+            else:
+                yield problemName, algorithm, None
+
+WARM_UP_LAYOUT = 'tinyMaze'
+
+def runBenchmark(layoutNames, algorithms, problems, options):
+    # Each combination first runs once, unrecorded, on a tiny layout, so the
+    # one-time costs of its first run in a process are not charged to
+    # whichever layout happens to come first
+    gameState = pacman.GameState()
+    gameState.initialize(layout.getLayout(WARM_UP_LAYOUT), 0)
+    for problemName, algorithm, heuristic in combinations(algorithms, problems):
+        runOne(gameState, WARM_UP_LAYOUT, problemName, algorithm, heuristic, options)
+
+    results = []
+    for layoutName in layoutNames:
+        gameState = pacman.GameState()
+        gameState.initialize(layout.getLayout(layoutName), 0)
+        # The neighbor table and distance oracle are shared by every layout
+        # with the same walls.  Building them first keeps them out of every
+        # run's time and memory, whichever layouts and runs came before.
+        distanceOracle.getNeighborTable(gameState.getWalls())
+        distanceOracle.getDistanceOracle(gameState.getWalls())
+        for problemName, algorithm, heuristic in combinations(algorithms, problems):
+            row = runOne(gameState, layoutName, problemName, algorithm, heuristic, options)
+            results.append(row)
+            if not options.quiet:
+                print('%-18s %-22s %-6s %-18s %-7s %10s %9s %7s %12s' % tuple(
+                    '-' if row[f] is None else row[f] for f in FIELDS))
+                sys.stdout.flush()
+    return results
+
+##########################################
+# BASELINES                              #
+##########################################
+
+def _key(row):
+    return (row['layout'], row['problem'], row['algorithm'], row['heuristic'])
+
+def findRegressions(results, baseline, tolerance, minTime):
+    """
+    Compares results with baseline rows and returns a list of messages.  A
+    run regresses if it now exceeds the budget, expands a different number of
+    nodes, finds a costlier path, runs more than tolerance slower (ignoring
+    runs under minTime seconds) or peaks more than tolerance higher in memory.
+    """
+    previous = dict((_key(row), row) for row in baseline)
+    regressions = []
+    for row in results:
+        old = previous.get(_key(row))
+        if old is None: continue
+        name = '/'.join(_key(row))
+        if row['status'] != old['status']:
+            if row['status'] == 'budget':
+                regressions.append('%s: now exceeds the budget' % name)
+            continue
+        if row['status'] != 'ok': continue
+        if row['expanded'] != old['expanded']:
+            regressions.append('%s: expanded %s nodes, baseline %s' % (name, row['expanded'], old['expanded']))
+        if row['cost'] > old['cost']:
+            regressions.append('%s: path cost %s, baseline %s' % (name, row['cost'], old['cost']))
+        if row['time'] > max(old['time'], minTime) * (1 + tolerance):
+            regressions.append('%s: %.3fs, baseline %.3fs' % (name, row['time'], old['time']))
+        if row['peakMemory'] is not None and old.get('peakMemory') is not None and \
+                row['peakMemory'] > old['peakMemory'] * (1 + tolerance):
+            regressions.append('%s: peak memory %d bytes, baseline %d' % (name, row['peakMemory'], old['peakMemory']))
+    return regressions
+
+def writeJson(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+
+def writeCsv(results, path):
+    with open(path, 'w') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+def readBaseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+def readCommand(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python searchBenchmark.py [options]')
+    parser.add_option('-l', '--layouts', dest='layouts', default=None,
+                      help='comma separated layout names [Default: every layout in layouts/]')
+    parser.add_option('-a', '--algorithms', dest='algorithms', default=','.join(ALGORITHMS),
+                      help='comma separated search functions [Default: %default]')
+    parser.add_option('-p', '--problems', dest='problems', default=','.join(PROBLEMS),
+                      help='comma separated problem types [Default: %default]')
+    parser.add_option('-c', '--csv', dest='csv', default=None,
+                      help='write the results to this CSV file')
+    parser.add_option('-j', '--json', dest='json', default=None,
+                      help='write the results to this JSON file')
+    parser.add_option('-b', '--baseline', dest='baseline', default=None,
+                      help='JSON results to check for regressions against')
+    parser.add_option('--save-baseline', dest='saveBaseline', default=None,
+                      help='write the results to this JSON file as the new baseline')
+    parser.add_option('-t', '--tolerance', dest='tolerance', type='float', default=0.25,
+                      help='allowed relative growth in time and memory [Default: %default]')
+    parser.add_option('--min-time', dest='minTime', type='float', default=0.05,
+                      help='runs faster than this many seconds are never timing regressions [Default: %default]')
+    parser.add_option('--max-expanded', dest='maxExpanded', type='int', default=100000,
+                      help='stop a run after this many expansions [Default: %default]')
+    parser.add_option('--max-time', dest='maxTime', type='float', default=10.0,
+                      help='stop a run after this many seconds [Default: %default]')
+    parser.add_option('--no-memory', dest='memory', action='store_false', default=True,
+                      help='skip the traced pass that measures peak memory')
+    parser.add_option('-q', '--quiet', dest='quiet', action='store_true', default=False,
+                      help='only print regressions')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+
+    if options.layouts:
+        layoutNames = options.layouts.split(',')
+    else:
+        layoutDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'layouts')
+        layoutNames = sorted(name[:-4] for name in os.listdir(layoutDir) if name.endswith('.lay'))
+    algorithms = options.algorithms.split(',')
+    problems = options.problems.split(',')
+    for algorithm in algorithms:
+        if algorithm not in dir(search):
+            raise Exception('Unknown search function: ' + algorithm)
+    for problemName in problems:
+        if problemName not in PROBLEMS:
+            raise Exception('Unknown problem type: ' + problemName)
+    return layoutNames, algorithms, problems, options
+
+def main(argv):
+    layoutNames, algorithms, problems, options = readCommand(argv)
+    results = runBenchmark(layoutNames, algorithms, problems, options)
+    if options.csv: writeCsv(results, options.csv)
+    if options.json: writeJson(results, options.json)
+    if options.saveBaseline: writeJson(results, options.saveBaseline)
+    if options.baseline:
+        regressions = findRegressions(results, readBaseline(options.baseline),
+                                      options.tolerance, options.minTime)
+        for message in regressions:
+            print('REGRESSION ' + message)
+        if regressions:
+            return 1
+        print('No regressions against %s' % options.baseline)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
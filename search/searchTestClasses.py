@@ -12,14 +12,17 @@
 # Pieter Abbeel (pabbeel@cs.berkeley.edu).
 
 
+import random
 import sys
 import re
 import testClasses
 import textwrap
+import util
 
 # import project specific code
 import layout
 import pacman
+from priorityQueueBenchmark import LinearScanPriorityQueue
 from search import SearchProblem
 
 # helper function for printing solutions in solution files
@@ -821,3 +824,110 @@ class CornerHeuristicPacman(testClasses.TestCase):
         handle.close()
         return True
 
+
+
+# Runs the same operations on util.PriorityQueue and LinearScanPriorityQueue
+# and checks that they pop the same items in the same order
+class PriorityQueueTest(testClasses.TestCase):
+
+    def __init__(self, question, testDict):
+        super(PriorityQueueTest, self).__init__(question, testDict)
+        self.seeds = int(testDict['seeds'])
+        self.steps = int(testDict['steps'])
+        self.items = int(testDict['items'])
+
+    def randomOperations(self, seed, mixed):
+        """
+        With mixed, items are pushed again while still queued and then mixed
+        with updates, as a UCS that calls both push and update does.
+        Otherwise only update adds items.
+        """
+        rand = random.Random(seed)
+        operations = []
+        if mixed:
+            operations = [('push', 0, 5), ('push', 0, 3), ('pop', None, None), ('update', 0, 4)]
+        for step in range(self.steps):
+            operation = rand.choice(['push', 'update', 'pop'] if mixed else ['update', 'update', 'pop'])
+            operations.append((operation, rand.randrange(self.items), rand.randrange(2 * self.items)))
+        return operations
+
+    def popSequence(self, queue, operations):
+        popped = []
+        for operation, item, priority in operations:
+            if operation == 'push':
+                queue.push(item, priority)
+            elif operation == 'update':
+                queue.update(item, priority)
+            elif not queue.isEmpty():
+                popped.append(queue.pop())
+        while not queue.isEmpty():
+            popped.append(queue.pop())
+        return popped
+
+    def execute(self, grades, moduleDict, solutionDict):
+        for mixed in [False, True]:
+            for seed in range(self.seeds):
+                operations = self.randomOperations(seed, mixed)
+                expected = self.popSequence(LinearScanPriorityQueue(), operations)
+                actual = self.popSequence(util.PriorityQueue(), operations)
+                if actual != expected:
+                    self.addMessage('Seed %d%s: popped %s' % (seed, ' (push and update)' if mixed else '', actual))
+                    self.addMessage('but the original PriorityQueue pops %s' % expected)
+                    return self.testFail(grades)
+        self.addMessage('%d operation sequences popped as with the original PriorityQueue' % (2 * self.seeds))
+        return self.testPass(grades)
+
+    def writeSolution(self, moduleDict, filePath):
+        handle = open(filePath, 'w')
+        handle.write('# This is the solution file for %s.\n' % self.path)
+        handle.write('# This test compares against LinearScanPriorityQueue and needs no solution.\n')
+        handle.close()
+        return True
+
+
+# Solves eight puzzles with A* and the pattern database heuristic and checks
+# the plan lengths against breadth-first distances from the goal
+class PatternDatabaseTest(testClasses.TestCase):
+
+    def __init__(self, question, testDict):
+        super(PatternDatabaseTest, self).__init__(question, testDict)
+        self.starts = [[int(tile) for tile in line.split()]
+                       for line in testDict['starts'].split('\n') if line.strip()]
+        self.samples = int(testDict['samples'])
+        self.seed = int(testDict['seed'])
+
+    def goalDistances(self, eightpuzzle):
+        "Every solvable eight puzzle, mapped to its number of moves from the goal."
+        goal = eightpuzzle.EightPuzzleState(list(range(9)))
+        distances = {goal: 0}
+        frontier = [goal]
+        for state in frontier:
+            for move in state.legalMoves():
+                successor = state.result(move)
+                if successor not in distances:
+                    distances[successor] = distances[state] + 1
+                    frontier.append(successor)
+        return distances
+
+    def execute(self, grades, moduleDict, solutionDict):
+        import eightpuzzle
+        search = moduleDict['search']
+        distances = self.goalDistances(eightpuzzle)
+        states = [eightpuzzle.EightPuzzleState(start) for start in self.starts]
+        states += random.Random(self.seed).sample(list(distances), self.samples)
+        for state in states:
+            problem = eightpuzzle.EightPuzzleSearchProblem(state)
+            path = search.aStarSearch(problem, eightpuzzle.patternDatabaseHeuristic)
+            if len(path) != distances[state]:
+                self.addMessage('Start %s: A* found %d moves but the shortest plan has %d'
+                                % (state.getNumbers(), len(path), distances[state]))
+                return self.testFail(grades)
+        self.addMessage('A* with patternDatabaseHeuristic solved %d puzzles optimally' % len(states))
+        return self.testPass(grades)
+
+    def writeSolution(self, moduleDict, filePath):
+        handle = open(filePath, 'w')
+        handle.write('# This is the solution file for %s.\n' % self.path)
+        handle.write('# This test compares against breadth-first distances and needs no solution.\n')
+        handle.close()
+        return True
@@ -0,0 +1,536 @@
+# distanceOracle.py
+# -----------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+This file contains a DistanceOracle, which computes the maze distance between
+every pair of open cells of a walls Grid once and then answers distance
+queries with a table lookup.
+
+Example:
+oracle = getDistanceOracle(gameState.getWalls())
+oracle.getDistance( (1,1), (10,10) )
+oracle.getNearest( (1,1), food.asList() )
+
+Open cells are numbered in the order of walls.asList(False) and the distances
+are kept in a square NumPy matrix indexed by those ids.  All sources are
+expanded together, one BFS layer per step, so the whole table costs one
+vectorized pass per layer instead of one Python BFS per cell.  Oracles are
+cached per wall layout, so every agent and problem on the same board shares
+one table.  Without NumPy a plain Python BFS fills the same table.
+
+The table takes cells * cells entries, so layouts with more than
+MAX_TABLE_CELLS open cells get no table: their rows are found by one BFS
+per source when first asked for, and only the most recent are kept.
+
+With NumPy and PACMAN_DISTANCE_CACHE set to a directory, tables are also
+saved to an on-disk cache (see DISK CACHE below) and memory-mapped back in by
+later processes, so a fresh pacman.py or autograder run on a known layout
+skips the computation entirely.
+
+The module also has a NearestFoodField (see NEAREST FOOD below), which
+tracks the path from every cell to its closest food as pellets are eaten,
+and NeighborTables (see NEIGHBOR TABLES below), which list the legal moves
+out of every cell so grid search problems need not work them out per call.
+"""
+
+import collections
+import hashlib
+import heapq
+import os
+import weakref
+from array import array
+from game import Directions
+
+try:
+    import numpy
+    _NUMPY_ENABLED = True
+except ImportError:
+    _NUMPY_ENABLED = False
+
+SOURCE_CHUNK = 1024      # Number of BFS sources expanded together
+MAX_TABLE_CELLS = 5000   # Largest layout (in open cells) given an all-pairs table
+ROW_CACHE_SIZE = 256     # BFS rows kept by oracles without a table
+CACHE_SIZE = 8           # Wall layouts whose oracles and neighbor tables stay cached
+
+class DistanceOracle:
+    """
+    All-pairs maze distances for a fixed walls Grid.  Use getDistanceOracle
+    rather than building one directly so the table is shared.
+    """
+    def __init__(self, walls, distances=None):
+        self.width = walls.width
+        self.height = walls.height
+        self.cells, self.cellIds, self.neighbors = buildGridGraph(walls)
+        if distances is None and len(self.cells) > MAX_TABLE_CELLS:
+            # Too big for a table: compute rows on demand instead
+            self.distances = None
+            self.rows = collections.OrderedDict() # source id -> BFS row, least recent first
+            self._lookup = self._lookupRow
+            return
+        if distances is None:
+            distances = self._computeDistances()
+        self.distances = distances
+        if _NUMPY_ENABLED and isinstance(distances, numpy.ndarray):
+            self._lookup = distances.item
+        else:
+            self._lookup = lambda i, j: distances[i][j]
+
+    def _computeDistances(self):
+        if _NUMPY_ENABLED:
+            return self._computeDistancesNumpy()
+        return self._computeDistancesPython()
+
+    def _computeDistancesNumpy(self):
+        """
+        Layered BFS from every source at once.  The frontier is a boolean
+        (cells + 1) x sources matrix; the extra row is an always-empty pad that
+        stands in for missing neighbors, so each layer is four row gathers.
+        """
+        n = len(self.cells)
+        dtype = numpy.int16 if n < numpy.iinfo(numpy.int16).max else numpy.int32
+        distances = numpy.full((n, n), -1, dtype=dtype)
+        neighborTable = numpy.full((n, 4), n, dtype=numpy.intp)
+        for i, ids in enumerate(self.neighbors):
+            neighborTable[i, :len(ids)] = ids
+        columns = [neighborTable[:, k] for k in range(4)]
+
+        for start in range(0, n, SOURCE_CHUNK):
+            sources = numpy.arange(start, min(n, start + SOURCE_CHUNK))
+            k = len(sources)
+            frontier = numpy.zeros((n + 1, k), dtype=bool)
+            frontier[sources, numpy.arange(k)] = True
+            seen = frontier[:n].copy()
+            block = numpy.full((n, k), -1, dtype=dtype)
+            block[sources, numpy.arange(k)] = 0
+            depth = 0
+            while True:
+                reached = frontier[columns[0]]
+                for column in columns[1:]:
+                    reached |= frontier[column]
+                reached &= ~seen
+                if not reached.any():
+                    break
+                depth += 1
+                seen |= reached
+                block[reached] = depth
+                frontier[:n] = reached
+            distances[start:start + k] = block.T
+        return distances
+
+    def _computeDistancesPython(self):
+        return [self._bfsRow(source) for source in range(len(self.cells))]
+
+    def _bfsRow(self, source):
+        "The distances from cell source to every cell, -1 where unreachable."
+        n = len(self.cells)
+        row = array('h' if n < 2 ** 15 - 1 else 'i', [-1]) * n
+        row[source] = 0
+        layer = [source]
+        depth = 0
+        while layer:
+            depth += 1
+            nextLayer = []
+            for cell in layer:
+                for neighbor in self.neighbors[cell]:
+                    if row[neighbor] < 0:
+                        row[neighbor] = depth
+                        nextLayer.append(neighbor)
+            layer = nextLayer
+        return row
+
+    def _lookupRow(self, i, j):
+        "Distance lookup for oracles without a table; distances are symmetric."
+        rows = self.rows
+        row = rows.get(i)
+        if row is None:
+            row = rows.get(j)
+            if row is not None:
+                rows.move_to_end(j)
+                return row[i]
+            row = rows[i] = self._bfsRow(i)
+            if len(rows) > ROW_CACHE_SIZE:
+                rows.popitem(last=False)
+        else:
+            rows.move_to_end(i)
+        return row[j]
+
+    def hasCell(self, pos):
+        return pos in self.cellIds
+
+    def getDistance(self, pos1, pos2):
+        """
+        Returns the maze distance between two open cells, or None if there is
+        no path between them.
+        """
+        try:
+            d = self._lookup(self.cellIds[pos1], self.cellIds[pos2])
+        except KeyError:
+            raise Exception("Positions not in grid: " + str((pos1, pos2)))
+        if d < 0: return None
+        return d
+
+    def getNearest(self, pos, targets):
+        """
+        Returns (distance, target) for the reachable target closest to pos, or
+        (None, None) if none of the targets can be reached.  Ties go to the
+        target that comes first in targets.
+        """
+        source = self.cellIds[pos]
+        lookup = self._lookup
+        bestDistance, bestTarget = None, None
+        for target in targets:
+            d = lookup(source, self.cellIds[target])
+            if d >= 0 and (bestDistance is None or d < bestDistance):
+                bestDistance, bestTarget = d, target
+                if d == 0: break
+        return bestDistance, bestTarget
+
+    def getDistancesFrom(self, pos):
+        "Returns a dict from every reachable cell to its maze distance from pos."
+        source = self.cellIds[pos]
+        lookup = self._lookup
+        result = {}
+        for j, cell in enumerate(self.cells):
+            d = lookup(source, j)
+            if d >= 0: result[cell] = d
+        return result
+
+def buildGridGraph(walls):
+    """
+    Numbers the open cells of walls in the order of walls.asList(False) and
+    returns (cells, cellIds, neighbors), where neighbors[i] holds the ids of
+    cell i's open North, South, East and West neighbors, in that order.
+    """
+    cells = walls.asList(False)
+    cellIds = dict((cell, i) for i, cell in enumerate(cells))
+    neighbors = []
+    for x, y in cells:
+        ids = []
+        for nx, ny in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)):
+            if 0 <= nx < walls.width and 0 <= ny < walls.height and not walls[nx][ny]:
+                ids.append(cellIds[(nx, ny)])
+        neighbors.append(tuple(ids))
+    return cells, cellIds, neighbors
+
+##########################################
+# NEIGHBOR TABLES                        #
+##########################################
+
+class NeighborTable:
+    """
+    The moves between the open cells of a walls Grid, computed once per wall
+    layout (use getNeighborTable).  For an open position pos:
+
+      successors[pos]     ((next position, action), ...)
+      unitSuccessors[pos] ((next position, action, 1), ...)
+      predecessors[pos]   ((previous position, action), ...)
+
+    where action leads from the first position to the second, always in the
+    order North, South, East, West.  Cells are numbered as in buildGridGraph
+    and neighborIds[i] holds the ids of cell i's neighbors in each of the
+    directions, -1 where a wall is in the way; with NumPy it is also kept as
+    the (cells x 4) array neighborArray.
+    """
+    directions = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]
+    vectors = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+    def __init__(self, walls):
+        self.cells = walls.asList(False)
+        self.cellIds = dict((cell, i) for i, cell in enumerate(self.cells))
+        self.successors, self.unitSuccessors, self.predecessors = {}, {}, {}
+        self.neighborIds = []
+        moves = list(zip(self.directions, self.vectors))
+        for x, y in self.cells:
+            successors, predecessors, ids = [], [], []
+            for action, (dx, dy) in moves:
+                nextCell = (x + dx, y + dy)
+                if nextCell in self.cellIds:
+                    successors.append((nextCell, action))
+                    ids.append(self.cellIds[nextCell])
+                else:
+                    ids.append(-1)
+                previousCell = (x - dx, y - dy)
+                if previousCell in self.cellIds:
+                    predecessors.append((previousCell, action))
+            self.successors[(x, y)] = tuple(successors)
+            self.unitSuccessors[(x, y)] = tuple([(cell, action, 1) for cell, action in successors])
+            self.predecessors[(x, y)] = tuple(predecessors)
+            self.neighborIds.append(tuple(ids))
+        if _NUMPY_ENABLED:
+            self.neighborArray = numpy.array(self.neighborIds, dtype=numpy.intp).reshape(len(self.cells), 4)
+
+# Both caches keep the CACHE_SIZE most recently used wall layouts, so a
+# process that loops over many layouts does not keep every table alive.
+# Grids still in use find theirs through the id(walls) maps.
+def _cacheGet(cache, key):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+def _cachePut(cache, key, value):
+    cache[key] = value
+    if len(cache) > CACHE_SIZE:
+        cache.popitem(last=False)
+
+_tableCache = collections.OrderedDict() # wall layout fingerprint -> NeighborTable, least recent first
+_tableByGrid = {}   # id(walls) -> (weakref to walls, NeighborTable)
+
+def getNeighborTable(walls):
+    "Returns the NeighborTable for a walls Grid, shared like getDistanceOracle's oracles."
+    entry = _tableByGrid.get(id(walls))
+    if entry is not None and entry[0]() is walls:
+        return entry[1]
+    key = (walls.width, walls.height, tuple(tuple(column) for column in walls.data))
+    table = _cacheGet(_tableCache, key)
+    if table is None:
+        table = NeighborTable(walls)
+        _cachePut(_tableCache, key, table)
+    gridId = id(walls)
+    ref = weakref.ref(walls, lambda r: _tableByGrid.pop(gridId, None))
+    _tableByGrid[gridId] = (ref, table)
+    return table
+
+##########################################
+# SHARING ORACLES BETWEEN CALLERS        #
+##########################################
+
+_oracleCache = collections.OrderedDict() # wall layout fingerprint -> DistanceOracle, least recent first
+_oracleByGrid = {}   # id(walls) -> (weakref to walls, DistanceOracle)
+
+def getDistanceOracle(walls):
+    """
+    Returns the DistanceOracle for a walls Grid, building it the first time
+    that wall layout is seen.  Repeated calls with the same Grid object skip
+    the layout fingerprint entirely.
+    """
+    entry = _oracleByGrid.get(id(walls))
+    if entry is not None and entry[0]() is walls:
+        return entry[1]
+    key = (walls.width, walls.height, tuple(tuple(column) for column in walls.data))
+    oracle = _cacheGet(_oracleCache, key)
+    if oracle is None:
+        oracle = loadCachedOracle(walls)
+        if oracle is None:
+            oracle = DistanceOracle(walls)
+            saveCachedOracle(walls, oracle)
+        _cachePut(_oracleCache, key, oracle)
+    gridId = id(walls)
+    ref = weakref.ref(walls, lambda r: _oracleByGrid.pop(gridId, None))
+    _oracleByGrid[gridId] = (ref, oracle)
+    return oracle
+
+##########################################
+# DISK CACHE                             #
+##########################################
+
+# Tables are stored as <digest>.npy, where digest hashes the wall characters
+# of the layout text together with CACHE_VERSION.  Bump the version whenever
+# the table format changes so older entries are simply never looked up.
+# The disk cache is off unless PACMAN_DISTANCE_CACHE names a directory, so
+# ordinary runs never write outside the project.
+CACHE_VERSION = 1
+CACHE_DIR = os.environ.get('PACMAN_DISTANCE_CACHE', '')
+VERIFY_ROWS = 2 # Rows of a loaded table checked against a fresh BFS
+
+def wallsText(walls):
+    "The walls Grid drawn like layout text: '%' for a wall, ' ' otherwise, top row first."
+    rows = []
+    for y in range(walls.height - 1, -1, -1):
+        rows.append(''.join(['%' if walls[x][y] else ' ' for x in range(walls.width)]))
+    return '\n'.join(rows)
+
+def cachePath(walls):
+    text = 'v%d\n%s' % (CACHE_VERSION, wallsText(walls))
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, digest + '.npy')
+
+def loadCachedOracle(walls):
+    """
+    Returns an oracle whose table is memory-mapped from the disk cache, or
+    None if there is no usable entry.  Entries with the wrong shape or dtype,
+    truncated files, tables whose diagonal is not all zero and tables whose
+    sampled rows disagree with a BFS over these walls (a table saved for
+    another layout) are treated as corrupt: they are deleted and recomputed.
+    """
+    if not _NUMPY_ENABLED or not CACHE_DIR: return None
+    path = cachePath(walls)
+    if not os.path.exists(path): return None
+    n = len(walls.asList(False))
+    if n > MAX_TABLE_CELLS: return None
+    dtype = numpy.int16 if n < numpy.iinfo(numpy.int16).max else numpy.int32
+    try:
+        distances = numpy.load(path, mmap_mode='r', allow_pickle=False)
+        valid = (distances.shape == (n, n) and distances.dtype == dtype
+                 and not distances.diagonal().any())
+    except (OSError, ValueError, EOFError):
+        valid = False
+    oracle = None
+    if valid:
+        oracle = DistanceOracle(walls, distances)
+        for source in range(0, n, max(1, n // VERIFY_ROWS)):
+            if not numpy.array_equal(distances[source], numpy.array(oracle._bfsRow(source), dtype=dtype)):
+                oracle = None
+                break
+    if oracle is None:
+        _removeQuietly(path)
+    return oracle
+
+def saveCachedOracle(walls, oracle):
+    """
+    Writes the oracle's table to the disk cache.  The file is written under a
+    temporary name and renamed into place, so readers never see a partial
+    entry.  Failing to write the cache is never an error.
+    """
+    if not _NUMPY_ENABLED or not CACHE_DIR: return
+    if not isinstance(oracle.distances, numpy.ndarray): return
+    path = cachePath(walls)
+    tmpPath = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        if not os.path.isdir(CACHE_DIR): os.makedirs(CACHE_DIR)
+        with open(tmpPath, 'wb') as f:
+            numpy.save(f, oracle.distances, allow_pickle=False)
+        os.replace(tmpPath, path)
+    except OSError:
+        _removeQuietly(tmpPath)
+
+def _removeQuietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+##########################################
+# NEAREST FOOD                           #
+##########################################
+
+class NearestFoodField:
+    """
+    The maze distance from every open cell to its nearest food, found by one
+    breadth-first search from all the food at once.  Following neighbors
+    whose distance is one less leads from any cell to a closest pellet.
+
+    Pellets only ever disappear, so removeFood repairs the field locally:
+    the cells whose every shortest route ran through the eaten pellet are
+    found by walking outward from it, and only those are searched again,
+    seeded from the unaffected cells around them.
+
+    field = NearestFoodField(gameState.getWalls(), gameState.getFood())
+    field.syncFood(gameState.getFood())
+    field.getPathToNearest(gameState.getPacmanPosition())
+    """
+    def __init__(self, walls, food):
+        self.walls = walls
+        self.cells, self.cellIds, self.neighbors = buildGridGraph(walls)
+        self.unreached = len(self.cells) + 1 # Distance of cells that cannot reach food
+        self.isFood = [bool(food[x][y]) for x, y in self.cells]
+        self.foodIds = set(i for i, isFood in enumerate(self.isFood) if isFood)
+        self.distances = [self.unreached] * len(self.cells)
+        layer = sorted(self.foodIds)
+        for i in layer:
+            self.distances[i] = 0
+        depth = 0
+        while layer:
+            depth += 1
+            nextLayer = []
+            for cell in layer:
+                for neighbor in self.neighbors[cell]:
+                    if self.distances[neighbor] == self.unreached:
+                        self.distances[neighbor] = depth
+                        nextLayer.append(neighbor)
+            layer = nextLayer
+
+    def removeFood(self, pos):
+        "Marks the pellet at pos as eaten and repairs the distances it supported."
+        source = self.cellIds.get(pos)
+        if source is None or not self.isFood[source]:
+            return
+        self.isFood[source] = False
+        self.foodIds.discard(source)
+        distances, neighbors, unreached = self.distances, self.neighbors, self.unreached
+
+        # Cells are visited in order of distance, so by the time a cell is
+        # checked every affected cell one step closer is already known.
+        affected = set([source])
+        queue = [source]
+        for cell in queue:
+            for neighbor in neighbors[cell]:
+                d = distances[neighbor]
+                if d != distances[cell] + 1 or neighbor in affected:
+                    continue
+                for other in neighbors[neighbor]:
+                    if distances[other] == d - 1 and other not in affected:
+                        break
+                else:
+                    affected.add(neighbor)
+                    queue.append(neighbor)
+
+        for cell in affected:
+            distances[cell] = unreached
+        heap = []
+        for cell in affected:
+            best = unreached
+            for neighbor in neighbors[cell]:
+                if neighbor not in affected and distances[neighbor] + 1 < best:
+                    best = distances[neighbor] + 1
+            if best < unreached:
+                distances[cell] = best
+                heap.append((best, cell))
+        heapq.heapify(heap)
+        while heap:
+            d, cell = heapq.heappop(heap)
+            if d != distances[cell]: continue
+            for neighbor in neighbors[cell]:
+                if neighbor in affected and d + 1 < distances[neighbor]:
+                    distances[neighbor] = d + 1
+                    heapq.heappush(heap, (d + 1, neighbor))
+
+    def syncFood(self, food):
+        """
+        Removes every tracked pellet that is no longer in the food Grid.  As
+        food is never added back, an unchanged count means nothing to do.
+        """
+        if food.count() == len(self.foodIds):
+            return
+        cells = self.cells
+        for i in [i for i in self.foodIds if not food[cells[i][0]][cells[i][1]]]:
+            self.removeFood(cells[i])
+
+    def getDistance(self, pos):
+        "Returns the maze distance from pos to the nearest food, or None if no food is reachable."
+        d = self.distances[self.cellIds[pos]]
+        if d == self.unreached: return None
+        return d
+
+    def getPathToNearest(self, pos):
+        """
+        Returns the actions leading from pos to a nearest pellet, or None if
+        no food is reachable.  Steps prefer North, South, East, then West.
+        """
+        cell = self.cellIds[pos]
+        distances, cells = self.distances, self.cells
+        if distances[cell] == self.unreached:
+            return None
+        actions = []
+        while distances[cell] > 0:
+            for neighbor in self.neighbors[cell]:
+                if distances[neighbor] == distances[cell] - 1:
+                    break
+            (x, y), (nx, ny) = cells[cell], cells[neighbor]
+            if ny > y: actions.append(Directions.NORTH)
+            elif ny < y: actions.append(Directions.SOUTH)
+            elif nx > x: actions.append(Directions.EAST)
+            else: actions.append(Directions.WEST)
+            cell = neighbor
+        return actions